@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# Import-time benchmark: headless core vs. Qt adapter.
+#
+#   python benchmarks/bench_import.py [--repeat 5]
+#
+# Each case runs in a fresh interpreter with "python -X importtime" and
+# reports the cumulative import time of the top-level modules and
+# whether PyQt5 ended up in sys.modules.
+
+import argparse
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+CASES = [
+    ("core (load/get/save)", "import easyconfig.EasyConfig"),
+    ("core + Qt adapter", "import easyconfig.EasyConfig, easyconfig.config_widget, easyconfig.dialog"),
+]
+
+
+def run(statement):
+    code = statement + "; import sys; print('PyQt5' in sys.modules)"
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1]
+
+    total = 0
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total, proc.stdout.strip() == "True"
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(args)
+
+    for name, statement in CASES:
+        results = [run(statement) for _ in range(args.repeat)]
+        if results[0][0] is None:
+            print("{:24s} failed: {}".format(name, results[0][1]))
+            continue
+        best = min(r[0] for r in results)
+        print("{:24s} {:8.1f} ms  PyQt5 loaded: {}".format(name, best / 1000, results[0][1]))
+
+
+if __name__ == "__main__":
+    main()
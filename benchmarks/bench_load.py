@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# Benchmark of Elem.load on trees of growing depth with the same number
+# of leaves. The time per leaf should stay flat as the depth grows; the
+# "walk per leaf" column resolves the dictionary of every leaf from the
+# top, as load used to do, for comparison.
+#
+#   python benchmarks/bench_load.py [--leaves 2000] [--depths 1,4,16,64] [--repeat 5]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from easyconfig.elem import Elem  # noqa: E402
+from easyconfig.kind import Kind  # noqa: E402
+
+
+def build(leaves, depth):
+    # A chain of depth subsections, the leaves spread evenly along it
+    root = Elem("root", Kind.ROOT, None)
+    config, other = {}, {}
+    node, section, section2 = root, config, other
+    per_level = max(1, leaves // depth)
+    count = 0
+    for d in range(depth):
+        node = node.addSubSection("s{}".format(d))
+        section = section.setdefault("s{}".format(d), {})
+        section2 = section2.setdefault("s{}".format(d), {})
+        for i in range(per_level if d < depth - 1 else leaves - count):
+            node.addInt("f{}".format(i), default=0)
+            section["f{}".format(i)] = i + 1
+            section2["f{}".format(i)] = -i
+        count += per_level
+    return root, config, other
+
+
+def walk_per_leaf(root, config):
+    def visit(node, keys):
+        for c in node.child:
+            if c.kind == Kind.SUBSECTION:
+                visit(c, keys + [c.key])
+            else:
+                dic = config
+                for k in keys:
+                    dic = dic.get(k)
+                    if dic is None:
+                        break
+                if dic is not None:
+                    c.set_value(dic.get(c.key, c.value))
+    visit(root, [])
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leaves", type=int, default=2000)
+    parser.add_argument("--depths", default="1,4,16,64")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(args)
+
+    print("{:>6s} {:>8s} {:>18s} {:>18s}".format("depth", "leaves", "load us/leaf", "walk per leaf"))
+    for depth in [int(d) for d in args.depths.split(",")]:
+        # Values alternate between two configurations so that every load changes them
+        root, config, other = build(args.leaves, depth)
+
+        def load():
+            root.load(config)
+            root.load(other)
+
+        def walk():
+            walk_per_leaf(root, config)
+            walk_per_leaf(root, other)
+
+        t_load = best(load, args.repeat) / args.leaves / 2 * 1e6
+        t_walk = best(walk, args.repeat) / args.leaves / 2 * 1e6
+        print("{:6d} {:8d} {:18.2f} {:18.2f}".format(depth, args.leaves, t_load, t_walk))
+
+
+if __name__ == "__main__":
+    main()
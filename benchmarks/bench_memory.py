@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# Memory benchmark: bytes per Elem node for a large generated tree.
+#
+#   python benchmarks/bench_memory.py [--fields 200000] [--width 100]
+#   python benchmarks/bench_memory.py --compare
+#
+# --compare also builds the tree with a copy of the node representation
+# easyconfig had before the nodes were compacted (a QObject subclass with a
+# __dict__, per-node kwargs/default_params dicts and signals, and a hidden
+# '+hidden' field in every subsection; needs PyQt5). Each representation is
+# measured in its own process, with tracemalloc (Python heap) and as growth
+# of the resident set size, which also counts the C++ side of the QObjects.
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from easyconfig.elem import Elem  # noqa: E402
+from easyconfig.kind import Kind  # noqa: E402
+
+
+def baseline_elem():
+    # The Elem of easyconfig before the compaction, reduced to what building
+    # a tree uses
+    from PyQt5.QtCore import QObject, pyqtSignal
+
+    class BaselineElem(QObject):
+        elem_value_changed = pyqtSignal()
+        elem_param_changed = pyqtSignal(dict)
+
+        def __init__(self, key, kind, parent=None, **kwargs):
+            super().__init__()
+            self.tree_view_item = None
+            self.kind = kind
+            self.kwargs = kwargs
+            self.save = kwargs.get("save", True)
+            self.hidden = kwargs.get("hidden", False)
+            self.value = kwargs.get("default", None)
+            self.default_params = {}
+            self.key = key
+            self.child = []
+            self.parent = parent
+            self.node = None
+            self.widget = None
+            self.dict_way = False
+
+        def set_default_params(self, params_dict, append=None, remove=None):
+            self.default_params = params_dict.copy()
+            if append is not None:
+                self.default_params.update(append)
+            remove = ["pretty", "default"] + (remove if remove else [])
+            for p in remove:
+                self.default_params.pop(p, None)
+
+        def add(self, key, kind=Kind.STR, **kwargs):
+            for k, v in self.default_params.items():
+                if k not in kwargs:
+                    kwargs[k] = v
+            elem = BaselineElem(key, kind, self, **kwargs)
+            elem.set_default_params(self.default_params)
+            self.addChild(elem)
+            return elem
+
+        def addChild(self, elem):
+            if elem.key in [c.key for c in self.child]:
+                raise Exception(f"Key '{elem.key}' already exists")
+            self.child.append(elem)
+
+        def addSubSection(self, key, **kwargs):
+            for k, v in self.default_params.items():
+                if k not in kwargs:
+                    kwargs[k] = v
+            elem = BaselineElem(key, Kind.SUBSECTION, self, **kwargs)
+            elem.set_default_params(self.default_params, kwargs)
+            self.addChild(elem)
+            elem.addInt("+hidden", default=0, hidden=True, save=False)
+            return elem
+
+        def addInt(self, name, **kwargs):
+            return self.add(name, Kind.INT, **kwargs)
+
+        def addString(self, name, **kwargs):
+            return self.add(name, Kind.STR, **kwargs)
+
+        def addCheckbox(self, name, **kwargs):
+            return self.add(name, Kind.CHECKBOX, **kwargs)
+
+    return BaselineElem
+
+
+def build(fields, width, node_class=Elem):
+    root = node_class("root", Kind.ROOT, None)
+    root.set_default_params({"editable": True})
+    section = None
+    for i in range(fields):
+        if i % width == 0:
+            section = root.addSubSection("section{}".format(i // width), pretty="Section")
+        kind = i % 3
+        if kind == 0:
+            section.addInt("field{}".format(i), default=0)
+        elif kind == 1:
+            section.addString("field{}".format(i), default="")
+        else:
+            section.addCheckbox("field{}".format(i), default=False)
+    return root
+
+
+def count(node):
+    return 1 + sum(count(c) for c in node.child)
+
+
+def rss():
+    # Resident set size in bytes (Linux), None elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def measure(fields, width, representation, method):
+    node_class = baseline_elem() if representation == "baseline" else Elem
+    gc.collect()
+    if method == "tracemalloc":
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        root = build(fields, width, node_class)
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+    else:
+        before = rss()
+        root = build(fields, width, node_class)
+        gc.collect()
+        used = rss() - before if before is not None else None
+    return {"nodes": count(root), "bytes": used}
+
+
+def compare(fields, width):
+    print("{:>9s} {:>8s} {:>22s} {:>16s}".format("", "nodes", "per field (tracemalloc)", "per field (rss)"))
+    for representation in ("baseline", "current"):
+        results = {}
+        for method in ("tracemalloc", "rss"):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--fields", str(fields),
+                                  "--width", str(width), "--representation", representation,
+                                  "--method", method], capture_output=True, text=True)
+            if out.returncode != 0:
+                print("{:>9s}: {}".format(representation, out.stderr.strip().splitlines()[-1]))
+                break
+            results[method] = json.loads(out.stdout)
+        else:
+            per_field = [results[m]["bytes"] / fields if results[m]["bytes"] is not None else float("nan")
+                         for m in ("tracemalloc", "rss")]
+            print("{:>9s} {:8d} {:22.0f} {:16.0f}".format(representation, results["tracemalloc"]["nodes"], *per_field))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fields", type=int, default=200000)
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("--compare", action="store_true", help="also measure the node representation before "
+                                                                 "the compaction (needs PyQt5)")
+    # Used by --compare to measure each representation in its own process
+    parser.add_argument("--representation", choices=("baseline", "current"), help=argparse.SUPPRESS)
+    parser.add_argument("--method", choices=("tracemalloc", "rss"), default="tracemalloc", help=argparse.SUPPRESS)
+    args = parser.parse_args(args)
+
+    if args.compare:
+        compare(args.fields, args.width)
+        return
+    if args.representation is not None:
+        print(json.dumps(measure(args.fields, args.width, args.representation, args.method)))
+        return
+
+    result = measure(args.fields, args.width, "current", "tracemalloc")
+    nodes, used = result["nodes"], result["bytes"]
+    print("fields: {}  nodes: {}  total: {:.1f} MB  per node: {:.0f} bytes  per field: {:.0f} bytes".format(
+        args.fields, nodes, used / 2 ** 20, used / nodes, used / args.fields))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# Microbenchmark for Elem.get/Elem.set path resolution.
+#
+#   python benchmarks/bench_path_cache.py [--width 50] [--depth 4] [--number 100000]
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from easyconfig.elem import Elem  # noqa: E402
+from easyconfig.kind import Kind  # noqa: E402
+
+
+def build(width, depth):
+    root = Elem("root", Kind.ROOT, None)
+    node = root
+    for d in range(depth - 1):
+        for i in range(width):
+            node.addInt("f{}".format(i), default=i)
+        node = node.addSubSection("s{}".format(d))
+    for i in range(width):
+        node.addInt("f{}".format(i), default=i)
+    path = "/".join("s{}".format(d) for d in range(depth - 1)) + "/f{}".format(width - 1)
+    return root, path
+
+
+def uncached_get(root, path):
+    return root.get_child(path.split("/")).value
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args(args)
+
+    root, path = build(args.width, args.depth)
+    handle = root.resolve(path)
+
+    cases = [
+        ("walk (split + get_child)", lambda: uncached_get(root, path)),
+        ("root.get (cached)", lambda: root.get(path)),
+        ("root.set (cached)", lambda: root.set(path, 1)),
+        ("handle.get", lambda: handle.get()),
+        ("handle.set", lambda: handle.set(1)),
+    ]
+
+    print("path: {} (width={}, depth={})".format(path, args.width, args.depth))
+    base = None
+    for name, fn in cases:
+        t = min(timeit.repeat(fn, number=args.number, repeat=3)) / args.number
+        base = base or t
+        print("{:28s} {:8.1f} ns/call  x{:.2f}".format(name, t * 1e9, base / t))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# Startup time of EasyConfig.load on a large file: without the cache,
+# with the cache missing or stale (cold: parse and write it) and with a
+# valid cache (warm). Every run builds the tree from scratch, as a
+# process starting up would do.
+#
+#   python benchmarks/bench_startup.py [--sizes 1000 10000 100000] [--repeat 5]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from easyconfig.cache import cache_filename  # noqa: E402
+from easyconfig.EasyConfig import EasyConfig  # noqa: E402
+
+
+def build(fields, width=100):
+    config = EasyConfig()
+    root = config.root()
+    section = None
+    for i in range(fields):
+        if i % width == 0:
+            section = root.addSubSection("section{}".format(i // width))
+        kind = i % 3
+        if kind == 0:
+            section.addInt("field{}".format(i), default=i)
+        elif kind == 1:
+            section.addString("field{}".format(i), default="value {}".format(i))
+        else:
+            section.addFloat("field{}".format(i), default=i / 7)
+    return config
+
+
+def best(fn, setup, repeat):
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(args)
+
+    print("yaml backend: {}".format(EasyConfig.yaml_backend()))
+    print("{:>8s} {:>14s} {:>14s} {:>14s} {:>8s}".format("fields", "no cache ms", "cold ms", "warm ms", "speedup"))
+    with tempfile.TemporaryDirectory() as folder:
+        for fields in args.sizes:
+            filename = os.path.join(folder, "config{}.yaml".format(fields))
+            build(fields).save(filename)
+
+            # The tree is built outside of the measured time
+            def fresh():
+                return build(fields)
+
+            def fresh_without_cache():
+                if os.path.exists(cache_filename(filename)):
+                    os.remove(cache_filename(filename))
+                return build(fields)
+
+            plain = best(lambda config: config.load(filename), fresh, args.repeat)
+            cold = best(lambda config: config.load(filename, cache=True), fresh_without_cache, args.repeat)
+            warm = best(lambda config: config.load(filename, cache=True), fresh, args.repeat)
+            print("{:8d} {:14.1f} {:14.1f} {:14.1f} {:7.1f}x".format(fields, plain * 1e3, cold * 1e3, warm * 1e3,
+                                                                     plain / warm))
+
+
+if __name__ == "__main__":
+    main()
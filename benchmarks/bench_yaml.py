@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# Load/save throughput of EasyConfig across file sizes, for the pure
+# Python YAML backend and the libyaml one (when available).
+#
+#   python benchmarks/bench_yaml.py [--sizes 100 1000 10000 100000]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import yaml  # noqa: E402
+
+from easyconfig import yaml_io  # noqa: E402
+from easyconfig.EasyConfig import EasyConfig  # noqa: E402
+
+
+def build(fields, width=100):
+    config = EasyConfig()
+    root = config.root()
+    section = None
+    for i in range(fields):
+        if i % width == 0:
+            section = root.addSubSection("section{}".format(i // width))
+        kind = i % 4
+        if kind == 0:
+            section.addInt("field{}".format(i), default=i)
+        elif kind == 1:
+            section.addString("field{}".format(i), default="value {}".format(i))
+        elif kind == 2:
+            section.addFloat("field{}".format(i), default=i / 7)
+        else:
+            section.addList("field{}".format(i), default=["a", "b", "c"])
+    return config
+
+
+def best(fn, repeat, setup=None):
+    # setup() is not timed, its result is passed to fn
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(args)
+
+    backends = [("python", yaml.SafeLoader, None)]
+    if yaml_io.BACKEND == "libyaml":
+        backends.append(("libyaml", yaml_io.SafeLoader, yaml_io.FastDumper))
+
+    print("active backend: {}".format(EasyConfig.yaml_backend()))
+    print("{:>8s} {:>9s} {:>8s} {:>12s} {:>12s}".format("fields", "size", "backend", "load MB/s", "save MB/s"))
+
+    folder = tempfile.mkdtemp()
+    filename = os.path.join(folder, "config.yaml")
+    for fields in args.sizes:
+        config = build(fields)
+        config.save(filename)
+        size = os.path.getsize(filename) / 2 ** 20
+
+        for name, loader, dumper in backends:
+            yaml_io.SafeLoader, yaml_io.FastDumper = loader, dumper
+            load = best(lambda _: config.load(filename), args.repeat)
+            # A new tree each time: saving a tree unchanged since the last
+            # save to the same file is skipped
+            save = best(lambda c: c.save(filename), args.repeat, lambda: build(fields))
+            print("{:8d} {:7.2f}MB {:>8s} {:12.2f} {:12.2f}".format(fields, size, name, size / load, size / save))
+
+        yaml_io.SafeLoader, yaml_io.FastDumper = backends[-1][1], backends[-1][2]
+        os.remove(filename)
+    os.rmdir(folder)
+
+
+if __name__ == "__main__":
+    main()
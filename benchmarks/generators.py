@@ -0,0 +1,72 @@
+# Synthetic trees for the benchmarks. Every generator adds fields fields
+# to a new EasyConfig and returns it with the paths of its leaves.
+#
+#   wide:  a single subsection with all the fields
+#   deep:  a chain of depth nested subsections, the fields spread along it
+#   mixed: subsections of width fields of all the common kinds
+
+from easyconfig.EasyConfig import EasyConfig
+from easyconfig.kind import Kind
+
+KINDS = [
+    (Kind.INT, lambda i: i),
+    (Kind.STR, lambda i: "value {}".format(i)),
+    (Kind.FLOAT, lambda i: i / 7),
+    (Kind.CHECKBOX, lambda i: i % 2 == 0),
+    (Kind.LIST, lambda i: ["a", "b", str(i)]),
+    (Kind.PASSWORD, lambda i: "secret{}".format(i)),
+    (Kind.EDITBOX, lambda i: "line {}\nline {}".format(i, i + 1)),
+    (Kind.FILE, lambda i: "/tmp/file{}.txt".format(i)),
+]
+
+
+def wide(fields, **kwargs):
+    config = EasyConfig(**kwargs)
+    section = config.root().addSubSection("wide")
+    paths = []
+    for i in range(fields):
+        section.addInt("field{}".format(i), default=i)
+        paths.append("wide/field{}".format(i))
+    return config, paths
+
+
+def deep(fields, depth=50, **kwargs):
+    config = EasyConfig(**kwargs)
+    node, prefix = config.root(), ""
+    per_level = max(1, fields // depth)
+    paths = []
+    for d in range(depth):
+        node = node.addSubSection("level{}".format(d))
+        prefix += "level{}/".format(d)
+        for i in range(per_level if d < depth - 1 else fields - len(paths)):
+            node.addInt("field{}".format(i), default=i)
+            paths.append(prefix + "field{}".format(i))
+    return config, paths
+
+
+def mixed(fields, width=100, **kwargs):
+    config = EasyConfig(**kwargs)
+    root = config.root()
+    section = None
+    paths = []
+    for i in range(fields):
+        if i % width == 0:
+            section = root.addSubSection("section{}".format(i // width))
+        kind, default = KINDS[i % len(KINDS)]
+        section.add("field{}".format(i), kind, default=default(i))
+        paths.append("section{}/field{}".format(i // width, i))
+    return config, paths
+
+
+SHAPES = {"wide": wide, "deep": deep, "mixed": mixed}
+
+
+def changed_value(value):
+    # A different value of the same type
+    if isinstance(value, bool):
+        return not value
+    if isinstance(value, (int, float)):
+        return value + 1
+    if isinstance(value, list):
+        return value + ["x"]
+    return value + "x"
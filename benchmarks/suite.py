@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# Benchmark suite of the core and GUI hot paths on synthetic trees (see
+# generators.py). Results are written as JSON so that runs of different
+# versions can be compared; the GUI cases run on the offscreen Qt platform
+# and are skipped when PyQt5 is not installed.
+#
+#   python benchmarks/suite.py [--shapes wide deep mixed] [--sizes 1000 10000]
+#                              [--repeat 3] [--no-gui] [--output results.json]
+#   python benchmarks/suite.py --compare before.json after.json
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import easyconfig  # noqa: E402
+from easyconfig.EasyConfig import EasyConfig  # noqa: E402
+
+import generators  # noqa: E402
+
+
+def best(fn, repeat, setup=None):
+    # Minimum time of fn(setup()) over repeat runs, setup is not measured
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def core_cases(shape, fields, folder):
+    build = generators.SHAPES[shape]
+    config, paths = build(fields)
+    root = config.root()
+    values = [{path: root.get(path) for path in paths}]
+    values.append({path: generators.changed_value(value) for path, value in values[0].items()})
+    filename = os.path.join(folder, "{}{}.yaml".format(shape, fields))
+    config.save(filename)
+
+    def set_all(_):
+        # To the changed values and back, every set changes the value
+        for current in reversed(values):
+            for path, value in current.items():
+                root.set(path, value)
+
+    def dirty_tree():
+        root.set(paths[0], generators.changed_value(root.get(paths[0])))
+        for path in paths:
+            root.get_child(path).mark_dirty()
+
+    def fresh(_=None):
+        return build(fields)[0]
+
+    return [
+        ("add", fields, lambda _: build(fields), None),
+        ("get", fields, lambda _: [root.get(path) for path in paths], None),
+        ("set", 2 * fields, set_all, None),
+        ("getDictionary", fields, lambda _: root.getDictionary({}), dirty_tree),
+        ("getDictionary (cached)", fields, lambda _: root.getDictionary({}), None),
+        ("save", fields, lambda c: c.save(filename), fresh),
+        ("load", fields, lambda c: c.load(filename), fresh),
+    ]
+
+
+def gui_cases(shape, fields):
+    try:
+        from PyQt5.QtWidgets import QApplication
+    except ImportError:
+        return []
+    app = QApplication.instance() or QApplication([])
+    from easyconfig.config_model import ConfigModelWidget
+    from easyconfig.config_widget import ConfigWidget, shown_children
+    from easyconfig.kind import Kind
+
+    config, paths = generators.SHAPES[shape](fields)
+    root = config.root()
+    built = []
+
+    def construct(cls):
+        def fn(_):
+            built[:] = [cls(root)]
+            app.processEvents()
+        return fn
+
+    # Expanded state with every subsection open, as get_expanded returns it
+    sections = [1]
+
+    def visit(elem):
+        for c in shown_children(elem):
+            sections.append(1 if c.kind == Kind.SUBSECTION else 0)
+            if c.kind == Kind.SUBSECTION:
+                visit(c)
+    visit(root)
+
+    def collapsed_widget():
+        widget = ConfigWidget(root, expand=False)
+        built[:] = [widget]
+        return widget
+
+    def expanded_widget():
+        widget = collapsed_widget()
+        widget.set_expanded(list(sections))
+        return widget
+
+    return [
+        ("ConfigWidget", fields, construct(ConfigWidget), None),
+        ("ConfigModelWidget", fields, construct(ConfigModelWidget), None),
+        ("ConfigWidget expand all", fields, lambda w: w.set_expanded(list(sections)), collapsed_widget),
+        ("collect", fields, lambda w: w.collect(), expanded_widget),
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for shape in args.shapes:
+            for fields in args.sizes:
+                cases = core_cases(shape, fields, folder)
+                if not args.no_gui:
+                    cases += gui_cases(shape, fields)
+                for name, ops, fn, setup in cases:
+                    seconds = best(fn, args.repeat, setup)
+                    results.append({"shape": shape, "fields": fields, "case": name, "seconds": seconds,
+                                    "us_per_op": seconds / ops * 1e6})
+                    print("{:6s} {:>7d} {:24s} {:10.2f} ms {:8.2f} us/op".format(
+                        shape, fields, name, seconds * 1e3, seconds / ops * 1e6), file=sys.stderr)
+    return {
+        "version": easyconfig.__version__,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "yaml_backend": EasyConfig.yaml_backend(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+
+def compare(before, after):
+    with open(before) as f:
+        old = {(r["shape"], r["fields"], r["case"]): r for r in json.load(f)["results"]}
+    with open(after) as f:
+        new = json.load(f)["results"]
+    print("{:6s} {:>7s} {:24s} {:>12s} {:>12s} {:>8s}".format("shape", "fields", "case", "before us/op",
+                                                              "after us/op", "ratio"))
+    for r in new:
+        o = old.get((r["shape"], r["fields"], r["case"]))
+        if o is None:
+            continue
+        print("{:6s} {:7d} {:24s} {:12.2f} {:12.2f} {:7.2f}x".format(r["shape"], r["fields"], r["case"],
+                                                                    o["us_per_op"], r["us_per_op"],
+                                                                    o["us_per_op"] / r["us_per_op"]))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shapes", nargs="+", choices=sorted(generators.SHAPES), default=["wide", "deep", "mixed"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-gui", action="store_true")
+    parser.add_argument("--output", help="JSON file, standard output if missing")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args(args)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+
+if __name__ == "__main__":
+    main()
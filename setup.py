@@ -6,9 +6,11 @@ setup(
     packages=find_packages(where="src"),  # Specify src directory
     package_dir={"": "src"},  # Tell setuptools that packages are under src
     install_requires=[
-        "pyqt5",
         "pyyaml"
     ],
+    extras_require={
+        "qt": ["pyqt5"]
+    },
     author="Danilo Tardioli",
     author_email="dantard@unizar.es",
     description="A library for easy configuration",
@@ -1,22 +1,33 @@
+import os
 import sys
+import threading
 import traceback
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
-import yaml
-from PyQt5.QtWidgets import (
-    QDialog
-)
-
+from easyconfig import cache as config_cache
+from easyconfig import yaml_io
 from easyconfig.callbacks import Callback
-from easyconfig.config_widget import ConfigWidget
-from easyconfig.dialog import Dialog
+from easyconfig.document import Document, file_stat
 from easyconfig.elem import Elem
+from easyconfig.gui_thread import call_in_gui_thread
 from easyconfig.kind import Kind
+from easyconfig.stats import Stats, timer
+from easyconfig.watch import FileWatcher
 
 
 class EasyConfig:
 
-    def __init__(self, **kwargs):
+    # GUI backends: "widgets" (one QWidget per field, QTreeWidget) or
+    # "model" (QTreeView over a model, editors created on demand)
+    BACKENDS = ("widgets", "model")
+
+    # Shared by all the instances, see load_async
+    executor = None
+    executor_lock = threading.Lock()
+
+    def __init__(self, backend="widgets", **kwargs):
         self.min_height = None
         self.min_width = None
         self.root_node = Elem("root", Kind.ROOT, None)
@@ -24,18 +35,83 @@ class EasyConfig:
         self.reserved = "main"
         self.expanded = None
         self.widget = None
+        self.backend = None
+        self.set_backend(backend)
+        # Widgets and dialogs built so far, see get_view
+        self.views = {}
+        # Last known on-disk content of the files loaded/saved
+        self.documents = {}
+        # (file, node) -> state of the tree when it was last saved there
+        self.saved = {}
+        # Loads are applied one at a time; of the loads of the same file
+        # in the same node, the last one started wins
+        self.load_lock = threading.RLock()
+        # (file, node) -> sequence number of the last load started
+        self.load_sequences = {}
+        # [apply or None until read] of the load_async in progress, in the
+        # order they were started, which is the order they are applied in
+        self.pending_loads = deque()
+        # file -> FileWatcher, see watch
+        self.watchers = {}
+
+    @classmethod
+    def from_schema(cls, schema, backend="widgets", **kwargs):
+        # schema: a Schema (compiled once, reusable) or anything Schema accepts
+        from easyconfig.schema import Schema
+        if not isinstance(schema, Schema):
+            schema = Schema(schema)
+        config = cls(backend, **kwargs)
+        schema.build(config.root_node)
+        return config
 
     def set_callback_enabled(self, enabled):
         Callback.callback_enabled = enabled
 
+    def set_backend(self, backend):
+        if backend not in self.BACKENDS:
+            raise Exception("Backend must be one of {}".format(", ".join(self.BACKENDS)))
+        self.backend = backend
+
+    def widget_class(self):
+        # Qt is only needed (and imported) when a GUI is requested
+        if self.backend == "model":
+            from easyconfig.config_model import ConfigModelWidget
+            return ConfigModelWidget
+        from easyconfig.config_widget import ConfigWidget
+        return ConfigWidget
+
+    @staticmethod
+    def yaml_backend():
+        # "libyaml" if the C accelerated loader/dumper is in use, "python" otherwise
+        return yaml_io.backend()
+
     def root(self):
         return self.root_node
 
+    def get_view(self, key, node, build):
+        # Widgets (and dialogs) are built once per node and reused until
+        # the structure of the tree changes; when shown again only the
+        # values that changed in the meanwhile are refreshed
+        from PyQt5 import sip
+
+        view = self.views.get(key)
+        if view is None or view["generation"] != node.tree.generation or sip.isdeleted(view["widget"]):
+            with timer(node.tree.stats, "widget.build"):
+                widget = build()
+            view = self.views[key] = {"widget": widget, "dialog": None, "generation": node.tree.generation,
+                                      "revision": node.tree.revision}
+        elif view["revision"] != node.tree.revision:
+            view["widget"].refresh()
+        return view
+
     def get_widget(self, node=None, skip_heading_subsection=False):
         node = node or self.root_node
-        self.widget = ConfigWidget(node, skip_heading_subsection)
-        if self.expanded:
-            self.widget.set_expanded(self.expanded)
+        view = self.get_view(("widget", node, skip_heading_subsection, self.backend), node,
+                             lambda: self.widget_class()(node, skip_heading_subsection))
+        self.widget = view["widget"]
+        if self.expanded and self.expanded != self.widget.get_expanded():
+            self.widget.set_expanded(list(self.expanded))
+        view["revision"] = node.tree.revision
         return self.widget
 
     def set_dialog_minimum_size(self, width=None, height=None):
@@ -46,26 +122,41 @@ class EasyConfig:
         return self.edit(node)
 
     def edit(self, node=None):
+        from PyQt5.QtWidgets import QDialog
+        from easyconfig.dialog import Dialog
+
         if node is None:
             node = self.root_node
 
-        config_widget = ConfigWidget(node)
-        dialog = Dialog(config_widget)
+        def build():
+            # Subsections start collapsed: they are populated when expanded
+            widget = self.widget_class()(node, expand=False)
+            widget.list.collapseAll()
+            return widget
+
+        view = self.get_view(("edit", node, self.backend), node, build)
+        config_widget = view["widget"]
+        if view["dialog"] is None:
+            view["dialog"] = Dialog(config_widget)
+        dialog = view["dialog"]
 
         if self.min_width is not None:
             config_widget.setMinimumWidth(self.min_width)
         if self.min_height is not None:
             config_widget.setMinimumHeight(self.min_height)
 
-        config_widget.list.collapseAll()
-        if self.expanded:
-            config_widget.set_expanded(self.expanded)
+        if self.expanded and self.expanded != config_widget.get_expanded():
+            config_widget.set_expanded(list(self.expanded))
 
         res = dialog.exec()
         self.expanded = config_widget.get_expanded()
 
         if res == QDialog.Accepted:
             config_widget.collect()
+            view["revision"] = node.tree.revision
+        else:
+            # Edits not applied may still be shown by the widgets
+            view["revision"] = None
 
         return res
 
@@ -73,8 +164,8 @@ class EasyConfig:
         if self.expanded:
             if node is None:
                 node = self.root_node
-            if tree.get("easyconfig") is None:
-                tree["easyconfig"] = {}
+            # A copy: tree may hold the cached dictionaries of the nodes
+            tree["easyconfig"] = dict(tree.get("easyconfig") or {})
             tree["easyconfig"].update({"expanded-" + node.key: "".join(str(e) for e in self.expanded)})
 
     def recover_easyconfig_info(self, tree, node=None):
@@ -90,28 +181,230 @@ class EasyConfig:
         if self.widget is not None:
             self.expanded = self.widget.get_expanded()
 
+        # Nothing changed since the last save to this same file
+        path = os.path.abspath(filename)
+        state = (self.root_node.tree.revision, list(self.expanded) if self.expanded else None)
+        saved = self.saved.get((path, node))
+        if saved is not None and saved == (state, file_stat(path)):
+            return
+
+        stats = self.root_node.tree.stats
         if node is None:
-            self.root_node.getDictionary(tree)
+            self.root_node.cached_dictionary(tree)
+            self.store_easyconfig_info(tree, node)
+            with timer(stats, "save.dump"):
+                document = Document(yaml_io.dump(tree))
         else:
-            with open(filename, "r") as f:
-                saved_tree = yaml.safe_load(f)
-            node.getDictionary(tree)
-            saved_tree[node.key] = tree[node.key]
-            tree = saved_tree
-
-        self.store_easyconfig_info(tree, node)
-        # print(tree)
-        with open(filename, "w") as f:
-            yaml.dump(tree, f, sort_keys=False)
-
-    def load(self, filename, node=None, callbacks=False):
+            # Only the section of the node (and the easyconfig info)
+            # is serialized again and spliced in the cached document
+            document = self.get_document(filename)
+            node.cached_dictionary(tree)
+            with timer(stats, "save.dump"):
+                document.set(node.key, tree[node.key])
+                if self.expanded:
+                    info = {"easyconfig": document.get("easyconfig")}
+                    self.store_easyconfig_info(info, node)
+                    document.set("easyconfig", info["easyconfig"])
+
+        with timer(stats, "save.write"):
+            document.write(filename)
+        self.documents[path] = document
+        self.saved[(path, node)] = (state, document.stat)
+
+    def get_document(self, filename):
+        path = os.path.abspath(filename)
+        document = self.documents.get(path)
+        if document is None or document.stat != file_stat(path):
+            document = self.documents[path] = Document.read(path)
+        return document
+
+    def read_config(self, filename, cache=False):
+        # cache: keep the parsed content in a file next to the config file
+        # and use it while the config file does not change
+        with timer(self.root_node.tree.stats, "load.read"):
+            document = Document.read(filename)
+            if cache:
+                return document, config_cache.load(filename, document)
+            return document, yaml_io.load(document.text)
+
+    def apply_config(self, filename, document, config, node=None, callbacks=False):
+        with self.load_lock, timer(self.root_node.tree.stats, "load.apply"):
+            self.documents[os.path.abspath(filename)] = document
+            self.recover_easyconfig_info(config, node)
+            # self.add_dynamic_fields(config)
+            if node is None:
+                node = self.root_node
+            node.load(config, callbacks=callbacks)
+
+    def load(self, filename, node=None, callbacks=False, cache=False):
+        # Supersedes any load_async of the file in the node still in progress
+        self.next_load_sequence(filename, node)
         try:
-            with open(filename, "r") as f:
-                config = yaml.safe_load(f)
-                self.recover_easyconfig_info(config, node)
-                # self.add_dynamic_fields(config)
-                if node is None:
-                    node = self.root_node
-                node.load(config, callbacks=callbacks)
+            document, config = self.read_config(filename, cache)
+            self.apply_config(filename, document, config, node, callbacks)
         except Exception as e:
             print("Config file not found or corrupted")
+
+    def next_load_sequence(self, filename, node=None):
+        key = (os.path.abspath(filename), self.root_node if node is None else node)
+        with self.load_lock:
+            sequence = self.load_sequences[key] = self.load_sequences.get(key, 0) + 1
+        return key, sequence
+
+    def load_async(self, filename, node=None, callbacks=False, cache=False):
+        # The file is read and parsed in a worker thread, the values are
+        # applied in the GUI thread (if there is a QApplication) in one batch.
+        # Returns a concurrent.futures.Future whose result is True once the
+        # values are applied, False if a later load of the same file in the
+        # same node superseded this one. Loads are applied in the order they
+        # were started
+        key, sequence = self.next_load_sequence(filename, node)
+        future = Future()
+        future.set_running_or_notify_cancel()
+        pending = [None]
+        with self.load_lock:
+            self.pending_loads.append(pending)
+
+        def apply(document, config):
+            try:
+                with self.load_lock:
+                    if sequence != self.load_sequences.get(key):
+                        future.set_result(False)
+                        return
+                    self.apply_config(filename, document, config, node, callbacks)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(True)
+
+        def read():
+            try:
+                document, config = self.read_config(filename, cache)
+            except Exception as e:
+                ready = lambda e=e: future.set_exception(e)
+            else:
+                ready = lambda: apply(document, config)
+            with self.load_lock:
+                pending[0] = ready
+            call_in_gui_thread(self.apply_pending_loads)
+
+        with EasyConfig.executor_lock:
+            if EasyConfig.executor is None:
+                EasyConfig.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="easyconfig")
+        EasyConfig.executor.submit(read)
+        return future
+
+    def apply_pending_loads(self):
+        # The loads read so far that were not started after one still being read
+        with self.load_lock:
+            while self.pending_loads and self.pending_loads[0][0] is not None:
+                self.pending_loads.popleft()[0]()
+
+    def enable_callback_threads(self, max_workers=4):
+        # Run the field callbacks on a thread pool instead of the thread
+        # setting the value (e.g. the GUI thread when a widget is edited)
+        from easyconfig.dispatch import CallbackDispatcher
+        tree = self.root_node.tree
+        if tree.dispatcher is None:
+            tree.dispatcher = CallbackDispatcher(max_workers)
+        return tree.dispatcher
+
+    def disable_callback_threads(self):
+        # Callbacks run synchronously again, once the pending ones are done
+        dispatcher = self.root_node.tree.dispatcher
+        self.root_node.tree.dispatcher = None
+        if dispatcher is not None:
+            dispatcher.shutdown()
+
+    def wait_callbacks(self, timeout=None):
+        # Wait for the callbacks running in other threads; False on timeout
+        dispatcher = self.root_node.tree.dispatcher
+        return dispatcher.wait(timeout) if dispatcher is not None else True
+
+    def set_event_loop(self, loop):
+        # Loop where the async def callbacks run, whatever the thread
+        # setting the value; without one they need a loop running in it
+        self.root_node.tree.loop = loop
+
+    def changes(self, prefix=""):
+        # async for change in config.changes("job/"): change.path, change.value
+        from easyconfig.aio import ChangeStream
+        return ChangeStream(self.root_node, prefix)
+
+    def enable_stats(self, sink=None):
+        # Count and time loads, saves, getDictionary, the construction of
+        # the widgets, collect and the callbacks (see stats.Stats)
+        if self.root_node.tree.stats is None:
+            self.root_node.tree.stats = Stats()
+        if sink is not None:
+            self.root_node.tree.stats.add_sink(sink)
+        return self.root_node.tree.stats
+
+    def disable_stats(self):
+        self.root_node.tree.stats = None
+
+    def stats(self):
+        # {name: {"count", "total", "mean", "min", "max", "p50", "p90", "p99", "histogram"}}
+        # with the times in seconds; empty when the stats are not enabled
+        stats = self.root_node.tree.stats
+        return stats.snapshot() if stats is not None else {}
+
+    def enable_history(self, limit=100, max_entries=1000000):
+        # Undo/redo of the values set, edited in the widgets or loaded;
+        # a load or a batch is a single step
+        from easyconfig.history import History
+        self.root_node.tree.history = History(self.root_node, limit, max_entries)
+        return self.root_node.tree.history
+
+    def disable_history(self):
+        self.root_node.tree.history = None
+
+    def undo(self, callbacks=True):
+        history = self.root_node.tree.history
+        return history is not None and history.undo(callbacks)
+
+    def redo(self, callbacks=True):
+        history = self.root_node.tree.history
+        return history is not None and history.redo(callbacks)
+
+    def diff(self, other, node=None):
+        # other: an EasyConfig, an Elem, a dictionary or a config file
+        if node is None:
+            node = self.root_node
+        if isinstance(other, EasyConfig):
+            other = other.root_node if node.kind == Kind.ROOT else other.root_node.get_child(node.get_path())
+            if other is None:
+                other = {}
+        elif isinstance(other, (str, Path)):
+            # Not kept in self.documents, the watchers would take the
+            # file as already loaded
+            other = yaml_io.load(Document.read(str(other)).text) or {}
+            if node.kind != Kind.ROOT:
+                for key in node.get_path().split("/"):
+                    other = other.get(key, {}) if type(other) is dict else {}
+        return node.diff(other)
+
+    def watch(self, filename, node=None, callbacks=True, delay=0.2, interval=1.0):
+        # Load the file again (see load_async) each time it is changed by
+        # someone else; only the fields whose value differs are set, so only
+        # their widgets and callbacks are involved
+        path = os.path.abspath(filename)
+        self.unwatch(path)
+
+        def changed():
+            document = self.documents.get(path)
+            if document is not None and document.stat == file_stat(path):
+                # Written by save or already loaded
+                return
+            future = self.load_async(path, node, callbacks)
+            future.add_done_callback(lambda f: f.exception() and print("Config file not found or corrupted"))
+
+        self.watchers[path] = FileWatcher(path, changed, delay, interval).start()
+        return self.watchers[path]
+
+    def unwatch(self, filename=None):
+        paths = list(self.watchers) if filename is None else [os.path.abspath(filename)]
+        for path in paths:
+            watcher = self.watchers.pop(path, None)
+            if watcher is not None:
+                watcher.stop()
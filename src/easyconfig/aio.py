@@ -0,0 +1,86 @@
+import asyncio
+import sys
+import time
+
+
+def schedule(tree, coroutine):
+    # Run a coroutine on the event loop of the tree (see
+    # EasyConfig.set_event_loop), or on the loop running in this thread.
+    # Called while a value is being set: without a loop the coroutine is
+    # dropped with a message instead of raising
+    loop = tree.loop
+    if loop is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            coroutine.close()
+            print("async callbacks need an event loop, see EasyConfig.set_event_loop", file=sys.stderr)
+            return None
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return loop.create_task(coroutine)
+    return asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+
+async def timed(stats, path, coroutine):
+    start = time.perf_counter()
+    try:
+        return await coroutine
+    finally:
+        elapsed = time.perf_counter() - start
+        stats.record("callback", elapsed)
+        stats.record("callback/" + path, elapsed)
+
+
+class Change:
+    __slots__ = ("path", "value")
+
+    def __init__(self, path, value):
+        self.path = path
+        self.value = value
+
+    def __repr__(self):
+        return "Change({!r}, {!r})".format(self.path, self.value)
+
+
+# Async iterator of the changes of the values under a path:
+#   async for change in config.changes("job/"): ...
+# Changes made in any thread (e.g. the Qt one) are queued on the loop
+# iterating; a batch gives one change per field, with its final value.
+class ChangeStream:
+
+    def __init__(self, root, prefix=""):
+        self.root = root
+        self.prefix = prefix.strip("/")
+        self.loop = None
+        self.queue = None
+
+    def __aiter__(self):
+        if self.queue is None:
+            self.loop = asyncio.get_running_loop()
+            self.queue = asyncio.Queue()
+            self.root.tree.values_changed.connect(self.push)
+        return self
+
+    async def __anext__(self):
+        if self.queue is None:
+            self.__aiter__()
+        return await self.queue.get()
+
+    def matches(self, path):
+        return not self.prefix or path == self.prefix or path.startswith(self.prefix + "/")
+
+    def push(self, paths):
+        for path in paths:
+            if self.matches(path):
+                elem = self.root.tree.find(self.root, path)
+                change = Change(path, elem.value if elem is not None else None)
+                if not self.loop.is_closed():
+                    self.loop.call_soon_threadsafe(self.queue.put_nowait, change)
+
+    def close(self):
+        if self.queue is not None:
+            self.root.tree.values_changed.disconnect(self.push)
@@ -0,0 +1,57 @@
+import hashlib
+import marshal
+import os
+
+from easyconfig import yaml_io
+from easyconfig.document import atomic_write
+
+# Bumped when the layout of the cache files changes
+VERSION = 1
+
+
+def cache_filename(filename):
+    folder, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(folder, ".{}.easyconfig-cache".format(name))
+
+
+def digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def cache_key(document):
+    # Size and mtime of the file when it was read, hash of its content
+    return (VERSION, yaml_io.BACKEND) + tuple(document.stat or ()) + (digest(document.text),)
+
+
+def load_cached(filename, document):
+    # The parsed content of the document if the cache next to the file is
+    # valid for it, None otherwise
+    try:
+        with open(cache_filename(filename), "rb") as f:
+            key, config = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if key != cache_key(document):
+        return None
+    return config
+
+
+def store_cached(filename, document, config):
+    # Values that marshal does not support (dates, ...) are not cached
+    try:
+        data = marshal.dumps((cache_key(document), config))
+    except ValueError:
+        return False
+    try:
+        atomic_write(cache_filename(filename), data)
+    except OSError:
+        return False
+    return True
+
+
+def load(filename, document):
+    config = load_cached(filename, document)
+    if config is None:
+        config = yaml_io.load(document.text)
+        store_cached(filename, document, config)
+    return config
@@ -0,0 +1,445 @@
+import base64
+
+from PyQt5 import QtCore, sip
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+from PyQt5.QtGui import QIntValidator, QDoubleValidator, QFontMetrics
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QTreeView,
+    QAbstractItemView,
+    QStyledItemDelegate,
+    QLineEdit,
+    QComboBox,
+    QSlider,
+    QPushButton,
+    QStyle,
+    QFileDialog
+)
+
+from easyconfig.config_widget import shown_children, count_items
+from easyconfig.gui_thread import call_in_gui_thread, in_gui_thread
+from easyconfig.kind import Kind
+from easyconfig.stats import timer
+
+READ_ONLY = (Kind.LABEL, Kind.DOUBLE_TEXT)
+
+
+def display_text(elem):
+    value = elem.value
+    kind = elem.kind
+    if value is None or kind == Kind.CHECKBOX:
+        return ""
+    fmt = elem.kwargs.get("fmt", "{}")
+    try:
+        if kind == Kind.COMBOBOX:
+            items = elem.kwargs.get("items", [])
+            return items[value] if 0 <= value < len(items) else ""
+        elif kind == Kind.PASSWORD:
+            return "●" * 8
+        elif kind == Kind.LIST:
+            return ", ".join(str(v) for v in value)
+        elif kind == Kind.EDITBOX:
+            return str(value).replace("&&", " ")
+        elif kind == Kind.DOUBLE_TEXT:
+            return "  ".join(fmt.format(v) for v in value if v is not None)
+        elif kind == Kind.SLIDER and type(fmt) == int:
+            return str(round(value, fmt)).rstrip('0').rstrip('.')
+        return fmt.format(value)
+    except (ValueError, TypeError, IndexError, KeyError):
+        return str(value)
+
+
+# Keeps the model informed of changes made to an Elem from outside
+# (the Elem signals only hold it weakly, the model holds it strongly)
+class ElemObserver:
+    __slots__ = ("model", "elem", "__weakref__")
+
+    def __init__(self, model, elem):
+        self.model = model
+        self.elem = elem
+
+    def changed(self):
+        # Emitted in the thread that set the value
+        if not in_gui_thread():
+            call_in_gui_thread(self.changed)
+            return
+        if not sip.isdeleted(self.model):
+            self.model.elem_changed(self.elem)
+
+
+class ConfigModel(QAbstractItemModel):
+
+    def __init__(self, node, skip_heading_subsection=False, parent=None):
+        super().__init__(parent)
+        self.node = node
+        if node.kind == Kind.SUBSECTION and not skip_heading_subsection and not node.hidden:
+            self.top = [node]
+        else:
+            self.top = list(shown_children(node))
+
+        # Rows are computed the first time they are requested
+        self.rows = {None: self.top}
+        self.parents = {}
+        self.row_of = {}
+        self.observers = []
+        self.register(None, self.top)
+
+    def register(self, parent, rows):
+        for i, elem in enumerate(rows):
+            self.parents[elem] = parent
+            self.row_of[elem] = i
+            observer = ElemObserver(self, elem)
+            elem.elem_value_changed.connect(observer.changed)
+            self.observers.append(observer)
+
+    def children_of(self, elem):
+        rows = self.rows.get(elem)
+        if rows is None:
+            rows = self.rows[elem] = list(shown_children(elem)) if elem.kind == Kind.SUBSECTION else []
+            self.register(elem, rows)
+        return rows
+
+    def is_fetched(self, elem):
+        return elem in self.rows
+
+    def elem(self, index):
+        return index.internalPointer() if index.isValid() else None
+
+    def index_of(self, elem, column=0):
+        row = self.row_of.get(elem)
+        if row is None:
+            return QModelIndex()
+        return self.createIndex(row, column, elem)
+
+    def index(self, row, column, parent=QModelIndex()):
+        rows = self.children_of(self.elem(parent))
+        if 0 <= row < len(rows) and 0 <= column < 2:
+            return self.createIndex(row, column, rows[row])
+        return QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = self.parents.get(index.internalPointer())
+        if parent is None:
+            return QModelIndex()
+        return self.createIndex(self.row_of[parent], 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.children_of(self.elem(parent)))
+
+    def hasChildren(self, parent=QModelIndex()):
+        elem = self.elem(parent)
+        if elem is None:
+            return len(self.top) > 0
+        if elem.kind != Kind.SUBSECTION or parent.column() > 0:
+            return False
+        if elem in self.rows:
+            return len(self.rows[elem]) > 0
+        return next(shown_children(elem), None) is not None
+
+    def columnCount(self, parent=QModelIndex()):
+        return 2
+
+    def flags(self, index):
+        elem = self.elem(index)
+        if elem is None:
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled
+        if index.column() == 1 and elem.kind not in READ_ONLY and elem.kind != Kind.SUBSECTION:
+            if elem.kind == Kind.CHECKBOX:
+                flags |= Qt.ItemIsUserCheckable
+            elif elem.kind == Kind.COMBOBOX or elem.kwargs.get("editable", True):
+                flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        elem = self.elem(index)
+        if elem is None:
+            return None
+        if index.column() == 0:
+            if role == Qt.DisplayRole:
+                return elem.get_pretty()
+        elif elem.kind != Kind.SUBSECTION:
+            if role == Qt.DisplayRole:
+                return display_text(elem)
+            elif role == Qt.EditRole:
+                return elem.value
+            elif role == Qt.CheckStateRole and elem.kind == Kind.CHECKBOX:
+                return Qt.Checked if elem.value else Qt.Unchecked
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        elem = self.elem(index)
+        if elem is None or index.column() != 1:
+            return False
+        if role == Qt.CheckStateRole and elem.kind == Kind.CHECKBOX:
+            value = value == Qt.Checked
+        elif role != Qt.EditRole:
+            return False
+        elem.update_value(value)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def elem_changed(self, elem):
+        index = self.index_of(elem, 1)
+        if index.isValid():
+            self.dataChanged.emit(index, index)
+
+
+class PathEditor(QWidget):
+
+    def __init__(self, kind, kwargs, parent=None):
+        super().__init__(parent)
+        self.kind = kind
+        self.kwargs = kwargs
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.text = QLineEdit()
+        button = QPushButton()
+        button.setIcon(self.style().standardIcon(QStyle.SP_DialogOpenButton))
+        button.setMaximumWidth(30)
+        button.clicked.connect(self.choose)
+        layout.addWidget(self.text)
+        layout.addWidget(button)
+        self.setFocusProxy(self.text)
+
+    def choose(self):
+        if self.kind == Kind.CHOSE_DIR:
+            name = QFileDialog.getExistingDirectory(self, "Select Directory", self.text.text())
+        elif self.kind == Kind.FILE_SAVE:
+            name, _ = QFileDialog.getSaveFileName(self, "Save File", self.text.text())
+        else:
+            extension = self.kwargs.get("extension", "txt")
+            extensions = extension if type(extension) == list else [extension]
+            name, _ = QFileDialog.getOpenFileName(self, "Open File", self.text.text(),
+                                                  "Files (" + " ".join("*." + e for e in extensions) + ")")
+        if name != "":
+            self.text.setText(name)
+
+
+# Editors only exist for the row being edited
+class ConfigDelegate(QStyledItemDelegate):
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.editor = None
+        self.index = None
+
+    def createEditor(self, parent, option, index):
+        elem = index.internalPointer()
+        kwargs = elem.kwargs
+        if elem.kind == Kind.COMBOBOX:
+            editor = QComboBox(parent)
+            editor.addItems(kwargs.get("items", []))
+            editor.setEditable(kwargs.get("editable", False))
+        elif elem.kind == Kind.SLIDER:
+            editor = QSlider(Qt.Horizontal, parent)
+            editor.setMinimum(kwargs.get("min", 0))
+            editor.setMaximum(kwargs.get("max", 100))
+        elif elem.kind in (Kind.FILE, Kind.FILE_SAVE, Kind.CHOSE_DIR):
+            editor = PathEditor(elem.kind, kwargs, parent)
+        else:
+            editor = QLineEdit(parent)
+            if elem.kind == Kind.INT:
+                validator = QIntValidator(editor)
+                if kwargs.get("max") is not None:
+                    validator.setTop(kwargs.get("max"))
+                if kwargs.get("min") is not None:
+                    validator.setBottom(kwargs.get("min"))
+                editor.setValidator(validator)
+            elif elem.kind == Kind.FLOAT:
+                editor.setValidator(QDoubleValidator(editor))
+            elif elem.kind == Kind.PASSWORD:
+                editor.setEchoMode(QLineEdit.Password)
+        self.editor, self.index = editor, QtCore.QPersistentModelIndex(index)
+        editor.destroyed.connect(self.editor_destroyed)
+        return editor
+
+    def editor_destroyed(self):
+        self.editor, self.index = None, None
+
+    def setEditorData(self, editor, index):
+        elem = index.internalPointer()
+        value = elem.value
+        if elem.kind == Kind.COMBOBOX:
+            editor.setCurrentIndex(value if value is not None and value < editor.count() else 0)
+        elif elem.kind == Kind.SLIDER:
+            editor.setValue(int((value or 0) * elem.kwargs.get("den", 1)))
+        elif elem.kind in (Kind.FILE, Kind.FILE_SAVE, Kind.CHOSE_DIR):
+            editor.text.setText("" if value is None else str(value))
+        elif elem.kind == Kind.PASSWORD:
+            try:
+                editor.setText(base64.decodebytes(value.encode()).decode() if value else "")
+            except (ValueError, UnicodeDecodeError):
+                editor.setText("")
+        elif elem.kind == Kind.LIST:
+            editor.setText(", ".join(str(v) for v in value) if value else "")
+        elif elem.kind == Kind.EDITBOX:
+            editor.setText("" if value is None else str(value).replace("&&", "\n"))
+        else:
+            editor.setText("" if value is None else str(value))
+
+    def setModelData(self, editor, model, index):
+        elem = index.internalPointer()
+        if elem.kind == Kind.COMBOBOX:
+            value = editor.currentIndex() if editor.currentText() != "" else None
+        elif elem.kind == Kind.SLIDER:
+            value = float(editor.value() / elem.kwargs.get("den", 1))
+        else:
+            text = editor.text.text() if isinstance(editor, PathEditor) else editor.text()
+            value = self.parse(elem, text)
+        if value != elem.value:
+            model.setData(index, value)
+
+    @staticmethod
+    def parse(elem, text):
+        if elem.kind == Kind.INT:
+            return int(text) if text.lstrip("-").isnumeric() else None
+        elif elem.kind == Kind.FLOAT:
+            try:
+                return float(text)
+            except ValueError:
+                return None
+        elif elem.kind == Kind.PASSWORD:
+            return base64.encodebytes(text.encode()).decode().replace("\n", "") if text != "" else None
+        elif elem.kind == Kind.LIST:
+            items = [t.strip() for t in text.split(",") if t.strip() != ""]
+            value_type = {"int": int, "float": float}.get(elem.kwargs.get("type", "str"), str)
+            try:
+                return [value_type(t) for t in items]
+            except ValueError:
+                return elem.value
+        elif elem.kind == Kind.EDITBOX:
+            text = text.replace("\n", "&&")
+        return text if text != "" else None
+
+    def commit(self, model):
+        if self.editor is not None and not sip.isdeleted(self.editor) and self.index.isValid():
+            self.setModelData(self.editor, model, model.index(self.index.row(), self.index.column(), self.index.parent()))
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
+
+
+# Same interface as ConfigWidget, backed by a model: there is one
+# editor at most, and only the visible rows are painted
+class ConfigModelWidget(QWidget):
+
+    def __init__(self, node, skip_heading_subsection=False, expand=True):
+        super().__init__(None)
+        self.setWindowTitle("EasyConfig")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.widgets = []
+        self.node = node
+
+        self.list = QTreeView()
+        self.list.header().setVisible(False)
+        self.list.setSelectionMode(QAbstractItemView.NoSelection)
+        self.list.setUniformRowHeights(True)
+        self.list.setEditTriggers(QAbstractItemView.AllEditTriggers)
+        self.model = ConfigModel(node, skip_heading_subsection, self.list)
+        self.delegate = ConfigDelegate(self.list)
+        self.list.setModel(self.model)
+        self.list.setItemDelegateForColumn(1, self.delegate)
+        self.setMinimumHeight(150)
+
+        # The width of the first column only grows, measuring
+        # the labels of the rows the first time they are shown
+        self.metrics = QFontMetrics(self.list.font())
+        self.label_width = 0
+        self.measured = set()
+        self.list.expanded.connect(self.fit_labels)
+        self.fit_labels(QModelIndex())
+        node.tree.updates_suspended.connect(self.suspend_updates)
+
+        for row in range(self.model.rowCount() if expand else 0):
+            self.list.expand(self.model.index(row, 0))
+
+        layout.addWidget(self.list)
+        self.setLayout(layout)
+        self.installEventFilter(self)
+
+    def suspend_updates(self, suspended):
+        if not in_gui_thread():
+            call_in_gui_thread(lambda: self.suspend_updates(suspended))
+            return
+        if not sip.isdeleted(self):
+            self.list.setUpdatesEnabled(not suspended)
+
+    def fit_labels(self, index):
+        elem = self.model.elem(index)
+        if elem in self.measured:
+            return
+        self.measured.add(elem)
+        depth = 0
+        node = index
+        while node.isValid():
+            depth += 1
+            node = node.parent()
+        indent = self.list.indentation() * (depth + 1)
+        width = max((self.metrics.horizontalAdvance(c.get_pretty()) for c in self.model.children_of(elem)), default=0)
+        if width + indent + 20 > self.label_width:
+            self.label_width = width + indent + 20
+            self.list.setColumnWidth(0, self.label_width)
+
+    def get_expanded(self):
+        res = [0]
+
+        def traver(elem):
+            index = self.model.index_of(elem)
+            res.append(1 if self.list.isExpanded(index) else 0)
+            if elem.kind != Kind.SUBSECTION:
+                return
+            if not self.model.is_fetched(elem):
+                res.extend([0] * count_items(elem))
+                return
+            for c in self.model.children_of(elem):
+                traver(c)
+
+        for elem in self.model.top:
+            traver(elem)
+        return res
+
+    def set_expanded(self, val):
+        def traver(elem, vec):
+            if len(vec) > 0:
+                expanded = vec.pop() == 1
+                if elem.kind != Kind.SUBSECTION:
+                    return
+                if not self.model.is_fetched(elem):
+                    first = max(0, len(vec) - count_items(elem))
+                    if not expanded and 1 not in vec[first:]:
+                        del vec[first:]
+                        return
+                self.list.setExpanded(self.model.index_of(elem), expanded)
+                for c in self.model.children_of(elem):
+                    traver(c, vec)
+
+        val.reverse()
+        if len(val) > 0:
+            val.pop()
+            for elem in self.model.top:
+                traver(elem, val)
+
+    def collect(self):
+        # Values are stored when edited; commit the editor still open
+        with timer(self.node.tree.stats, "widget.collect"):
+            self.delegate.commit(self.model)
+
+    def refresh(self):
+        # Rows read the values of the elems when they are painted
+        if self.delegate.editor is not None and not sip.isdeleted(self.delegate.editor):
+            self.list.closeEditor(self.delegate.editor, QStyledItemDelegate.NoHint)
+        self.list.viewport().update()
+
+    def eventFilter(self, a0, a1) -> bool:
+        if a1.type() == QtCore.QEvent.KeyPress:
+            if a1.key() in [Qt.Key_Return]:
+                return True
+        return False
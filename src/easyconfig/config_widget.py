@@ -1,4 +1,4 @@
-from PyQt5 import QtCore
+from PyQt5 import QtCore, sip
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (
     QWidget,
@@ -8,16 +8,48 @@ from PyQt5.QtWidgets import (
     QScrollArea, QTreeWidgetItem, QLabel
 )
 
+from easyconfig.gui_thread import call_in_gui_thread, in_gui_thread
 from easyconfig.kind import Kind
+from easyconfig.stats import timer
 from easyconfig.widgets import Integer, Label, Slider, File, SaveFile, FolderChoice, Checkbox, ComboBox, Float, Password, EditBox, List, DoubleLabel, String
 
 
+def shown_children(elem):
+    # Elems that get an item right below the item of elem (the
+    # subsections inside hidden subsections are moved one level up)
+    for c in elem.child:
+        if c.kind == Kind.SUBSECTION:
+            if c.hidden:
+                yield from shown_children(c)
+            else:
+                yield c
+        elif c.kind != Kind.DICTIONARY and not c.hidden and not c.parent.hidden:
+            yield c
+
+
+def count_items(elem):
+    n = 0
+    for c in shown_children(elem):
+        n += 1 + (count_items(c) if c.kind == Kind.SUBSECTION else 0)
+    return n
+
+
 class ConfigWidget(QWidget):
+
+    # Data roles of the tree items: the Elem of a subsection item and
+    # the flag of the placeholder child of a not yet materialized one
+    ELEM_ROLE = Qt.UserRole
+    PLACEHOLDER_ROLE = Qt.UserRole + 1
+
     def get_expanded(self):
         res = []
 
         def traver(node):
             res.append(1 if node.isExpanded() else 0)
+            if self.is_pending(node):
+                # Never expanded: all its (virtual) items are collapsed
+                res.extend([0] * self.count_items(node.data(0, self.ELEM_ROLE)))
+                return
             for i in range(node.childCount()):
                 traver(node.child(i))
 
@@ -27,13 +59,43 @@ class ConfigWidget(QWidget):
     def set_expanded(self, val):
         def traver(node, vec):
             if len(vec) > 0:
-                node.setExpanded(vec.pop() == 1)
+                expanded = vec.pop() == 1
+                if self.is_pending(node):
+                    # Skip the content unless something inside is expanded
+                    first = max(0, len(vec) - self.count_items(node.data(0, self.ELEM_ROLE)))
+                    if not expanded and 1 not in vec[first:]:
+                        del vec[first:]
+                        return
+                    self.materialize(node)
+                node.setExpanded(expanded)
                 for i in range(node.childCount()):
                     traver(node.child(i), vec)
 
         val.reverse()
         traver(self.list.invisibleRootItem(), val)
 
+    def is_pending(self, item):
+        return item.childCount() == 1 and item.child(0).data(0, self.PLACEHOLDER_ROLE) is True
+
+    def materialize(self, item):
+        # Create the children of a subsection the first time it is expanded
+        if self.is_pending(item):
+            item.removeChild(item.child(0))
+            elem = item.data(0, self.ELEM_ROLE)
+            with timer(elem.tree.stats, "widget.fill"):
+                for c in elem.child:
+                    self.fill_tree_widget(c, self.list, item)
+
+    def resize_labels(self, index=None):
+        with timer(self.node.tree.stats, "widget.resize"):
+            self.list.resizeColumnToContents(0)
+
+    def has_items(self, elem):
+        return next(shown_children(elem), None) is not None
+
+    def count_items(self, elem):
+        return count_items(elem)
+
     def create_widget(self, elem, tree, node):
         parent = node
         if elem.kind == Kind.INT:
@@ -70,7 +132,7 @@ class ConfigWidget(QWidget):
 
         if w is not None:
             elem.set_widget(w)
-            w.value_changed.connect(lambda: elem.update_value(w.get_value()))
+            w.connect_value_changed(lambda: elem.update_value(w.get_value()))
             child = QTreeWidgetItem()
             elem.tree_view_item = child
             parent.addChild(child)
@@ -97,7 +159,13 @@ class ConfigWidget(QWidget):
                 qtw.setText(0, elem.get_pretty())
                 qtw.setForeground(0, Qt.transparent)
 
-                node = qtw
+                # The content is created when the subsection is expanded
+                qtw.setData(0, self.ELEM_ROLE, elem)
+                if self.has_items(elem):
+                    placeholder = QTreeWidgetItem()
+                    placeholder.setData(0, self.PLACEHOLDER_ROLE, True)
+                    qtw.addChild(placeholder)
+                return
         elif not elem.hidden and not elem.parent.hidden:
             self.create_widget(elem, tree, node)
 
@@ -105,14 +173,37 @@ class ConfigWidget(QWidget):
             self.fill_tree_widget(c, tree, node)
 
     def collect(self):
+        # Changes held back by debounce/throttle are delivered first
         for w in self.widgets:
-            w.elem.value = w.get_value()
-
-    def __init__(self, node, skip_heading_subsection=False):
+            w.flush_value_changed()
+        with self.node.batch(), timer(self.node.tree.stats, "widget.collect"):
+            for w in self.widgets:
+                w.elem.set_value(w.get_value(), emit=False)
+
+    def refresh(self):
+        # Show again the values of the elems where they differ
+        # (edits that were cancelled, values set without emitting)
+        for w in self.widgets:
+            if w.get_value() != w.elem.value:
+                w.block_signals(True)
+                w.set_value(w.elem.value)
+                w.block_signals(False)
+
+    def suspend_updates(self, suspended):
+        # Batches of values are painted once, when they are all set;
+        # a batch ended in another thread is applied in the GUI one
+        if not in_gui_thread():
+            call_in_gui_thread(lambda: self.suspend_updates(suspended))
+            return
+        if not sip.isdeleted(self):
+            self.list.setUpdatesEnabled(not suspended)
+
+    def __init__(self, node, skip_heading_subsection=False, expand=True):
         super().__init__(None)
         self.setWindowTitle("EasyConfig")
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
+        self.node = node
         self.list = QTreeWidget()
         # self.list.setStyleSheet('background: palette(window)')
         self.list.header().setVisible(False)
@@ -128,12 +219,16 @@ class ConfigWidget(QWidget):
         scroll.setWidgetResizable(True)
 
         layout.addWidget(scroll)
-        self.fill_tree_widget(node, self.list, self.list.invisibleRootItem(), skip_heading_subsection=skip_heading_subsection)
-        self.list.expanded.connect(lambda: self.list.resizeColumnToContents(0))
+        with timer(node.tree.stats, "widget.fill"):
+            self.fill_tree_widget(node, self.list, self.list.invisibleRootItem(),
+                                  skip_heading_subsection=skip_heading_subsection)
+        self.list.itemExpanded.connect(self.materialize)
+        node.tree.updates_suspended.connect(self.suspend_updates)
+        self.list.expanded.connect(self.resize_labels)
         # self.list.expand()
         proxy = self.list.model()
 
-        for row in range(proxy.rowCount()):
+        for row in range(proxy.rowCount() if expand else 0):
             index = proxy.index(row, 0)
             self.list.expand(index)
 
@@ -141,7 +236,7 @@ class ConfigWidget(QWidget):
 
         self.setLayout(layout)
         self.installEventFilter(self)
-        self.list.resizeColumnToContents(0)
+        self.resize_labels()
         # self.setMinimumWidth(500)
 
     def eventFilter(self, a0, a1) -> bool:
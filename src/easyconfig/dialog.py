@@ -1,4 +1,5 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QDialogButtonBox
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QDialogButtonBox, QShortcut
 
 
 class Dialog(QDialog):
@@ -13,4 +14,9 @@ class Dialog(QDialog):
         self.bb.accepted.connect(self.accept)
         self.bb.rejected.connect(self.reject)
 
-        vbox.addWidget(self.bb)
\ No newline at end of file
+        vbox.addWidget(self.bb)
+
+        # Undo/redo when the history of the tree is enabled
+        self.tree = widget.node.tree
+        QShortcut(QKeySequence.Undo, self, lambda: self.tree.history and self.tree.history.undo())
+        QShortcut(QKeySequence.Redo, self, lambda: self.tree.history and self.tree.history.redo())
@@ -0,0 +1,76 @@
+from easyconfig.kind import Kind
+
+
+# Paths (relative to the compared node) that are only in the other side
+# (added), only in this side (removed) or in both with different values
+class Diff:
+
+    def __init__(self):
+        self.added = []
+        self.removed = []
+        self.changed = []
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __eq__(self, other):
+        return isinstance(other, Diff) and (self.added, self.removed, self.changed) == \
+            (other.added, other.removed, other.changed)
+
+    def __repr__(self):
+        return "Diff(added={}, removed={}, changed={})".format(self.added, self.removed, self.changed)
+
+
+def elem_content(elem):
+    # What the node writes in a config file; built from the dictionaries
+    # cached by cached_dictionary, so unchanged sections are the same objects
+    if elem.kind == Kind.ROOT:
+        dic = {}
+        elem.cached_dictionary(dic)
+        dic.pop("easyconfig", None)
+        return dic
+    dic = {}
+    elem.cached_dictionary(dic)
+    return dic.get(elem.key, {} if elem.kind == Kind.SUBSECTION else None)
+
+
+def is_params(value):
+    # A field saved with its parameters, {"+value": ..., "+hidden": ...}
+    return type(value) is dict and any(type(k) is str and k.startswith("+") for k in value)
+
+
+def leaf_value(value):
+    return value.get("+value") if is_params(value) else value
+
+
+def diff_dicts(a, b, result=None, prefix=""):
+    if result is None:
+        result = Diff()
+    if a is b:
+        return result
+    for key, value in a.items():
+        path = prefix + str(key)
+        if key not in b:
+            result.removed.append(path)
+            continue
+        other = b[key]
+        # Identical sections are compared at C level, without recursing
+        if value is other or value == other:
+            continue
+        if type(value) is dict and type(other) is dict and not is_params(value) and not is_params(other):
+            diff_dicts(value, other, result, path + "/")
+        elif leaf_value(value) != leaf_value(other):
+            result.changed.append(path)
+    for key in b:
+        if key not in a:
+            result.added.append(prefix + str(key))
+    return result
+
+
+def diff(a, b):
+    if type(a) is dict and type(b) is dict:
+        return diff_dicts(a, b)
+    result = Diff()
+    if leaf_value(a) != leaf_value(b):
+        result.changed.append("")
+    return result
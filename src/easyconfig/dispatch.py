@@ -0,0 +1,52 @@
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Runs the field callbacks on a thread pool (see
+# EasyConfig.enable_callback_threads). The callbacks of a field run one
+# at a time and in order; a value set while the callback of the previous
+# one is still waiting or running replaces the values not delivered yet,
+# so only the last one is delivered.
+class CallbackDispatcher:
+
+    def __init__(self, max_workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="easyconfig-callback")
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        # Elem -> (callback, value) to deliver next
+        self.pending = {}
+        # Elems with a task delivering their values
+        self.active = set()
+
+    def submit(self, elem, callback, value):
+        with self.lock:
+            self.pending[elem] = (callback, value)
+            if elem in self.active:
+                return
+            self.active.add(elem)
+        self.executor.submit(self.deliver, elem)
+
+    def deliver(self, elem):
+        while True:
+            with self.lock:
+                item = self.pending.pop(elem, None)
+                if item is None:
+                    self.active.discard(elem)
+                    if not self.active:
+                        self.idle.notify_all()
+                    return
+            try:
+                elem.run_callback(*item)
+            except Exception:
+                traceback.print_exc()
+
+    def wait(self, timeout=None):
+        # Until every callback submitted so far has run; False on timeout
+        with self.lock:
+            return self.idle.wait_for(lambda: not self.active, timeout)
+
+    def shutdown(self, wait=True):
+        if wait:
+            self.wait()
+        self.executor.shutdown(wait=wait)
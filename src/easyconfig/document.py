@@ -0,0 +1,163 @@
+import os
+import uuid
+
+import yaml
+
+from easyconfig import yaml_io
+
+
+def file_stat(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def atomic_write(filename, text):
+    # Write to a temporary file in the same folder and rename it over the
+    # destination so that readers never see a partially written file;
+    # text can be bytes as well. A symlink is written through: the file
+    # it points to is replaced, the link stays
+    filename = os.path.realpath(filename)
+    folder, name = os.path.split(filename)
+    tmp = os.path.join(folder, ".{}.{}.tmp".format(name, uuid.uuid4().hex[:8]))
+    try:
+        with open(tmp, "xb" if isinstance(text, bytes) else "x") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(filename):
+            os.chmod(tmp, os.stat(filename).st_mode & 0o7777)
+        os.replace(tmp, filename)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return file_stat(filename)
+
+
+# Text of a YAML file as it is on disk, split lazily in top-level
+# sections so that a single section can be re-serialized and spliced in
+# without parsing and dumping the rest of the document. The comments at
+# column 0 and the blank lines before a key are kept with its section
+# (as its lead), those after the last section are the tail.
+class Document:
+
+    def __init__(self, text, stat=None):
+        self.text = text
+        self.stat = stat
+        self.head = None
+        self.tail = None
+        # [key, lead, body] of each top-level key
+        self.sections = None
+        self.index = None
+
+    @staticmethod
+    def read(filename):
+        stat = file_stat(filename)
+        with open(filename, "r") as f:
+            text = f.read()
+        return Document(text, stat)
+
+    def split(self):
+        if self.sections is not None:
+            return True
+
+        try:
+            root = yaml.compose(self.text, Loader=yaml_io.SafeLoader)
+        except yaml.YAMLError:
+            return False
+
+        if root is None:
+            self.head, self.tail, self.sections, self.index = self.text, "", [], {}
+            return True
+
+        if not isinstance(root, yaml.MappingNode) or root.flow_style or self.has_aliases(root):
+            return False
+
+        starts = [k.start_mark.index for k, _ in root.value] + [len(self.text)]
+        self.head = self.text[:starts[0]]
+        self.sections, self.index = [], {}
+        lead = ""
+        for i, (k, v) in enumerate(root.value):
+            key = k.value if k.tag == "tag:yaml.org,2002:str" else None
+            end = self.section_end(v, starts[i + 1])
+            self.sections.append([key, lead, self.text[starts[i]:end]])
+            lead = self.text[end:starts[i + 1]]
+            if key is not None:
+                self.index[key] = i
+        self.tail = lead
+        return True
+
+    def section_end(self, value, limit):
+        # End of the line where the last scalar of value ends, or of the
+        # last indented line after it (e.g. the ] of a flow sequence or an
+        # indented comment); limit is the start of the next key
+        node = value
+        while isinstance(node, (yaml.MappingNode, yaml.SequenceNode)) and node.value:
+            node = node.value[-1][1] if isinstance(node, yaml.MappingNode) else node.value[-1]
+        end = node.end_mark.index
+        if end == 0 or self.text[end - 1] != "\n":
+            end = self.text.find("\n", end, limit)
+            end = limit if end < 0 else end + 1
+        pos = end
+        while pos < limit:
+            eol = self.text.find("\n", pos, limit)
+            eol = limit if eol < 0 else eol + 1
+            line = self.text[pos:eol]
+            if line.strip() and not line.startswith("#"):
+                end = eol
+            pos = eol
+        return end
+
+    @staticmethod
+    def has_aliases(root):
+        seen, stack = set(), [root]
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                return True
+            seen.add(id(node))
+            if isinstance(node, yaml.MappingNode):
+                for k, v in node.value:
+                    stack.append(k)
+                    stack.append(v)
+            elif isinstance(node, yaml.SequenceNode):
+                stack.extend(node.value)
+        return False
+
+    def get(self, key, default=None):
+        if self.split():
+            i = self.index.get(key)
+            if i is None:
+                return default
+            return (yaml_io.load(self.sections[i][2]) or {}).get(key, default)
+        return (yaml_io.load(self.text) or {}).get(key, default)
+
+    def set(self, key, value):
+        if self.split():
+            text = yaml_io.dump({key: value})
+            i = self.index.get(key)
+            if i is None:
+                # Before the tail, the comments at the end of the file
+                if self.sections and not self.sections[-1][2].endswith("\n"):
+                    self.sections[-1][2] += "\n"
+                elif not self.sections and self.head and not self.head.endswith("\n"):
+                    self.head += "\n"
+                self.index[key] = len(self.sections)
+                self.sections.append([key, "", text])
+            else:
+                self.sections[i][2] = text
+            self.text = self.head + "".join(lead + body for _, lead, body in self.sections) + self.tail
+        else:
+            # Not a plain block mapping: fall back to a full rewrite
+            tree = yaml_io.load(self.text)
+            if not isinstance(tree, dict):
+                tree = {}
+            tree[key] = value
+            self.text = yaml_io.dump(tree)
+            self.sections = None
+
+    def write(self, filename):
+        self.stat = atomic_write(filename, self.text)
@@ -1,10 +1,53 @@
-from PyQt5.QtCore import QObject, pyqtSignal
+import inspect
+import sys
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
 
 from easyconfig.callbacks import Callback
 from easyconfig.kind import Kind
+from easyconfig.observer import Signal
+from easyconfig.stats import timer
+from easyconfig.tree import Tree, Handle
 
 
-class Elem(QObject):
+EMPTY = MappingProxyType({})
+_shared_params = {}
+
+
+def copy_dictionary(dic):
+    return {key: copy_dictionary(value) if type(value) is dict else value for key, value in dic.items()}
+
+
+def params_signature(params):
+    # The type is part of it so that 1, 1.0 and True are told apart
+    return tuple(sorted((key, type(value), value) for key, value in params.items()))
+
+
+def shared_params(params):
+    # Identical field definitions share a single read-only mapping; those
+    # with callbacks are not interned, the table would keep their owners alive
+    if not params:
+        return EMPTY
+    if any(callable(value) and not isinstance(value, type) for value in params.values()):
+        return MappingProxyType(dict(params))
+    try:
+        signature = params_signature(params)
+        shared = _shared_params.get(signature)
+    except TypeError:
+        return MappingProxyType(dict(params))
+    if shared is None:
+        if len(_shared_params) >= 4096:
+            _shared_params.clear()
+        shared = _shared_params[signature] = MappingProxyType(dict(params))
+    return shared
+
+
+class Elem:
+
+    __slots__ = ("_value_changed", "_param_changed", "tree_view_item", "kind", "kwargs", "save", "hidden",
+                 "value", "default_params", "key", "child", "child_index", "parent", "tree", "node", "widget",
+                 "dict_way", "dirty", "dict_cache")
 
     callbacks_enabled = True
 
@@ -12,24 +55,42 @@ class Elem(QObject):
         def __init__(self, **kwargs):
             self.elem = kwargs
 
-    elem_value_changed = pyqtSignal()
-    elem_param_changed = pyqtSignal(dict)
-
     def __init__(self, key, kind, parent=None, **kwargs):
-        super().__init__()
+        self._value_changed = None
+        self._param_changed = None
         self.tree_view_item = None
         self.kind = kind
-        self.kwargs = kwargs
+        self.kwargs = shared_params(kwargs)
         self.save = kwargs.get("save", True)
         self.hidden = kwargs.get("hidden", False)
         self.value = kwargs.get("default", None)
-        self.default_params = {}
-        self.key = key
-        self.child = []
+        self.default_params = EMPTY
+        self.key = sys.intern(key)
+        # Allocated by addChild, leaves never need them
+        self.child = ()
+        self.child_index = EMPTY
         self.parent = parent
+        self.tree = parent.tree if parent is not None else Tree()
         self.node = None
         self.widget = None
         self.dict_way = False
+        # Set when the serialized form of the node (see getDictionary)
+        # changed; always propagated to the ancestors
+        self.dirty = True
+        self.dict_cache = None
+
+    # Signals are only created when something connects to them
+    @property
+    def elem_value_changed(self):
+        if self._value_changed is None:
+            self._value_changed = Signal()
+        return self._value_changed
+
+    @property
+    def elem_param_changed(self):
+        if self._param_changed is None:
+            self._param_changed = Signal()
+        return self._param_changed
 
     def set_widget(self, widget):
         self.widget = widget
@@ -38,29 +99,99 @@ class Elem(QObject):
         return self.widget
 
     def set_default_params(self, params_dict, append=None, remove=None):
-        self.default_params = params_dict.copy()
+        default_params = dict(params_dict)
 
         if append is not None:
-            self.default_params.update(append)
+            default_params.update(append)
 
         # Do not propagate the pretty and default parameters
         remove = ["pretty", "default"] + (remove if remove else [])
         for p in remove:
-            self.default_params.pop(p, None)
+            default_params.pop(p, None)
+
+        self.default_params = shared_params(default_params)
 
     def get_value(self):
         return self.value
 
     def update_param(self, **kwargs):
         # print("update_param", kwargs)
-        self.param_changed.emit(kwargs)
+        if self._param_changed is not None:
+            self._param_changed.emit(kwargs)
+
+    def mark_dirty(self):
+        self.tree.revision += 1
+        node = self
+        while node is not None and not node.dirty:
+            node.dirty = True
+            node = node.parent
+
+    def clean(self):
+        self.dirty = False
+        for c in self.child:
+            if c.dirty:
+                c.clean()
 
     def set_value(self, value, emit=True):
         if self.value != value:
+            if self.tree.history is not None:
+                self.tree.history.changing(self)
             self.value = value
-            self.elem_value_changed.emit()
-            if self.kwargs.get("callback", None) and Callback.callbacks_enabled:
-                self.kwargs["callback"](self.key, value)
+            self.mark_dirty()
+            if emit:
+                self.value_updated()
+            elif self.tree.history is not None and self.tree.batch is None:
+                self.tree.history.record()
+
+    def value_updated(self, emit=True):
+        # Inside a batch the notifications are deferred to its end
+        batch = self.tree.batch
+        if batch is not None:
+            batch.changed[self] = None
+            return
+        if emit and self._value_changed is not None:
+            self._value_changed.emit()
+        self.callback()
+        if self.tree.history is not None:
+            # Consecutive edits of a field in its widget are a single step
+            self.tree.history.record(None if emit else self)
+        if len(self.tree.values_changed):
+            self.tree.values_changed.emit([self.get_path()])
+
+    @contextmanager
+    def batch(self, callbacks=False):
+        # Values set inside the block update their widgets once at the end,
+        # with painting suspended, and are notified with a single
+        # tree.values_changed; the field callbacks run only if requested
+        self.tree.begin_batch(callbacks)
+        try:
+            yield self
+        finally:
+            self.tree.end_batch()
+
+    def set_values(self, values, callbacks=False):
+        # values: {"path/to/field": value, ...}
+        with self.batch(callbacks):
+            for key, value in values.items():
+                self.set(key, value)
+
+    def diff(self, other):
+        # other: an Elem or the dictionary of this node as in a config file;
+        # returns a Diff with the added, removed and changed paths
+        from easyconfig.diff import diff, elem_content
+        if isinstance(other, Elem):
+            other = elem_content(other)
+        elif self.kind == Kind.ROOT and type(other) is dict and "easyconfig" in other:
+            other = {k: v for k, v in other.items() if k != "easyconfig"}
+        return diff(elem_content(self), other)
+
+    def get_path(self):
+        keys = []
+        node = self
+        while node is not None and node.kind != Kind.ROOT:
+            keys.append(node.key)
+            node = node.parent
+        return "/".join(reversed(keys))
 
     def block_widget_signals(self, block):
         if self.widget is not None:
@@ -80,17 +211,17 @@ class Elem(QObject):
             key = key if not key.startswith("/") else key[1:]
             fields = key.split("/")
             node, field_index = self, -1
-            for i, field in enumerate(fields):
-                for child in node.child:  # type: Elem
-                    if child.key == field:
-                        node = child
-                        field_index = i
-                        break
+            for i, field in enumerate(fields[:-1]):
+                child = node.child_index.get(field)
+                if child is None:
+                    break
+                node = child
+                field_index = i
 
             for i in range(field_index + 1, len(fields) - 1):
                 node = node.addSubSection(fields[i])
 
-            elem = Elem(fields[-1], kind, self, **kwargs)
+            elem = Elem(fields[-1], kind, node, **kwargs)
             elem.set_default_params(self.default_params)
             node.addChild(elem)
 
@@ -101,6 +232,92 @@ class Elem(QObject):
 
         return elem
 
+    def add_many(self, fields):
+        # fields: (key, kind) or (key, kind, kwargs) tuples, keys can be paths
+        # as in add; the fields are checked, created and attached in bulk.
+        # Returns the new elems
+        sections = {"": self}
+        pending = {}
+        created = []
+        default_params = None
+        for field in fields:
+            key, kind = field[0], field[1]
+            kwargs = field[2] if len(field) > 2 else {}
+            if key.startswith("/"):
+                if self.kind != Kind.ROOT:
+                    raise Exception("A key can begin with '/' only if adding from the root node")
+                key = key[1:]
+            prefix, _, name = key.rpartition("/")
+            node = self.section(prefix, sections, pending)
+            names = pending.setdefault(node, {})
+            if name in node.child_index or name in names:
+                raise Exception(f"Key '{name}' already exists")
+
+            if kind == Kind.SUBSECTION:
+                elem = sections[key] = names[name] = node.new_subsection(name, dict(kwargs))
+                created.append(elem)
+                continue
+
+            # Parameters and default_params as add would set them
+            merged = {**self.default_params, **kwargs}
+            elem = Elem(name, kind, node)
+            if merged:
+                elem.kwargs = shared_params(merged)
+                elem.save = merged.get("save", True)
+                elem.hidden = merged.get("hidden", False)
+                elem.value = merged.get("default", None)
+            if default_params is None:
+                elem.set_default_params(self.default_params)
+                default_params = elem.default_params
+            elem.default_params = default_params
+            names[name] = elem
+            created.append(elem)
+
+        for node, names in pending.items():
+            if not names:
+                continue
+            if node.child_index is EMPTY:
+                node.child, node.child_index = [], {}
+            node.child.extend(names.values())
+            node.child_index.update(names)
+            node.mark_dirty()
+        self.tree.structure_changed()
+        return created
+
+    def section(self, path, sections, pending):
+        # Node at path for add_many, the subsections missing are created
+        # (and attached with the fields); sections caches the nodes found
+        node = sections.get(path)
+        if node is None:
+            parent_path, _, name = path.rpartition("/")
+            parent = self.section(parent_path, sections, pending)
+            names = pending.setdefault(parent, {})
+            node = parent.child_index.get(name) or names.get(name)
+            if node is None:
+                node = names[name] = parent.new_subsection(name, {})
+            sections[path] = node
+        return node
+
+    def add_from_dict(self, spec):
+        # spec as in schema.Schema; subsections that already exist are
+        # completed with the new fields
+        from easyconfig.schema import Schema
+
+        fields = []
+
+        def flatten(node, entries, prefix):
+            for key, kind, params, children in entries:
+                child = node.child_index.get(key) if node is not None else None
+                if kind == Kind.SUBSECTION and child is not None and child.kind == Kind.SUBSECTION:
+                    flatten(child, children, prefix + key + "/")
+                    continue
+                fields.append((prefix + key, kind, params))
+                if kind == Kind.SUBSECTION:
+                    flatten(None, children, prefix + key + "/")
+
+        flatten(self, Schema(spec).fields, "")
+        return self.add_many(fields)
+
     def addString(self, name, **kwargs):
         return self.add(name, Kind.STR, **kwargs)
 
@@ -252,9 +469,21 @@ class Elem(QObject):
         return None
 
     def addChild(self, elem):
-        if elem.key in [c.key for c in self.child]:
+        if elem.key in self.child_index:
             raise Exception(f"Key '{elem.key}' already exists")
+        if self.child_index is EMPTY:
+            self.child, self.child_index = [], {}
         self.child.append(elem)
+        self.child_index[elem.key] = elem
+        if elem.tree is not self.tree:
+            elem.set_tree(self.tree)
+        self.tree.structure_changed()
+        self.mark_dirty()
+
+    def set_tree(self, tree):
+        self.tree = tree
+        for c in self.child:
+            c.set_tree(tree)
 
     def has_key(self, key):
         return self.get_child(key) is not None
@@ -263,18 +492,17 @@ class Elem(QObject):
         return self.get_child(key)
 
     def addSubSection(self, key, **kwargs):
+        elem = self.new_subsection(key, kwargs)
+        self.addChild(elem)
+        return elem
 
+    def new_subsection(self, key, kwargs):
         for k, v in self.default_params.items():
             if not k in kwargs:
                 kwargs[k] = v
 
         elem = Elem(key, Kind.SUBSECTION, self, **kwargs)
         elem.set_default_params(self.default_params, kwargs)
-
-
-
-        self.addChild(elem)
-        elem.addInt("+hidden", default=0, hidden=True, save=False)
         return elem
 
     def getSubSection(self, key, create=True, **kwargs):
@@ -299,34 +527,66 @@ class Elem(QObject):
         return None
 
     def update_value(self, value):
-        self.value = value
-        callback = self.kwargs.get("callback")
-        if Callback.callbacks_enabled and callback is not None:
-            callback(self.key, self.value)
+        # Edited in the widget: the widget itself is already up to date
+        if self.value != value:
+            if self.tree.history is not None:
+                self.tree.history.changing(self)
+            self.value = value
+            self.mark_dirty()
+            self.value_updated(emit=False)
+        else:
+            self.callback()
 
     def update(self, **kwargs):
         if self.widget is not None:
             self.widget.update(**kwargs)
 
     def getDictionary(self, dic):
+        # The sections are copies: the dictionaries cached by
+        # fill_dictionary are never handed out
+        with timer(self.tree.stats, "getDictionary"):
+            self.fill_dictionary(dic)
+            keys = dic.keys() if self.kind == Kind.ROOT else (self.key,) if self.key in dic else ()
+            for key in keys:
+                if type(dic[key]) is dict:
+                    dic[key] = copy_dictionary(dic[key])
+
+    def cached_dictionary(self, dic):
+        # As getDictionary, but the sections that did not change are the
+        # cached dictionaries themselves, shared between calls: only for
+        # save, diff and History, which never modify them
+        with timer(self.tree.stats, "getDictionary"):
+            self.fill_dictionary(dic)
+
+    def fill_dictionary(self, dic):
+        # Sections that did not change since the last call
+        # reuse the dictionary built back then
         if self.kind == Kind.ROOT:
             dic.clear()
-            for c in self.child:
-                c.getDictionary(dic)
+            if self.dirty or self.dict_cache is None:
+                self.dict_cache = {}
+                self.dirty = False
+                for c in self.child:
+                    c.fill_dictionary(self.dict_cache)
+            dic.update(self.dict_cache)
         elif self.kind == Kind.SUBSECTION:
             if self.save:
-                dic[self.key] = {}
-                dic = dic[self.key]
-                for c in self.child:
-                    c.getDictionary(dic)
+                if self.dirty or self.dict_cache is None:
+                    self.dict_cache = {}
+                    self.dirty = False
+                    for c in self.child:
+                        c.fill_dictionary(self.dict_cache)
+                dic[self.key] = self.dict_cache
+            elif self.dirty:
+                self.clean()
         else:
+            self.dirty = False
             if self.save:
                 if not self.dict_way:
                     dic[self.key] = self.value
                 else:
                     dic[self.key] = {"+value": self.value, "+hidden": self.hidden, "+save": self.save}
 
-
     # def load(self, dic, keys=None, callbacks=False):
     #     def traverse_dict(d):
     #         if isinstance(d, dict):
@@ -351,53 +611,64 @@ class Elem(QObject):
         return "{},{}".format(self.key, self.value)
 
     def load(self, dic, keys=None, callbacks=False):
-        if self.kind == Kind.ROOT:
-            keys = []
-            for c in self.child:
-                c.load(dic, keys.copy(), callbacks)
-        elif self.kind == Kind.SUBSECTION:
-            if keys is None:
-                keys = []
-            keys.append(self.key)
-
-            for c in self.child:
-               c.load(dic, keys.copy(), callbacks)
-
-               # If there is a field +hidden
-               # and is true hide the field
-               if c.key == "+hidden":
-                   self.hidden = self.hidden or c.value
-                   self.set_visible(not self.hidden)
-        else:
-            for k in keys:
-                dic = dic.get(k)
-                if dic is None:
-                    break
-
-            if dic is not None:
-                Callback.callbacks_enabled = callbacks
-                dict_value = dic.get(self.key, self.value)
-
-                # NEW: MANAGE parameters for field
-                # They must start with a '+' and are
-                # value, hidden, save and addtionally
-                # all those valid for the widget itself
-
-                if type(dict_value) is dict and any([a.startswith('+') for a in dict_value.keys()]):
-                    value = dict_value.pop("+value")
-                    self.hidden = dict_value.pop("+hidden", False)
-                    self.set_visible(not self.hidden)
-                    self.save = dict_value.pop("+save", True)
-                    clean_dict = {key.lstrip('+'): value for key, value in dict_value.items()}
-                    self.kwargs.update(clean_dict)
-                    self.dict_way = True
+        # The dictionary and the tree are walked together once; keys is
+        # the path of the parent of this node in the dictionary
+        for k in keys or ():
+            dic = dic.get(k) if isinstance(dic, dict) else None
+
+        enabled = Callback.callbacks_enabled
+        Callback.callbacks_enabled = callbacks
+        try:
+            with self.batch(callbacks):
+                if self.kind == Kind.ROOT:
+                    self.load_children(dic)
                 else:
-                    # OLD basic case
-                    value = dict_value
-
-                self.set_value(value)
-                Callback.callbacks_enabled = True
+                    self.load_node(dic)
+        finally:
+            Callback.callbacks_enabled = enabled
+
+    def load_children(self, section):
+        for c in self.child:
+            c.load_node(section)
+
+    def load_node(self, dic):
+        if not isinstance(dic, dict):
+            dic = None
+
+        if self.kind == Kind.SUBSECTION:
+            section = dic.get(self.key) if dic is not None else None
+            # If there is a field +hidden
+            # and is true hide the section
+            if isinstance(section, dict):
+                self.hidden = self.hidden or section.get("+hidden", 0)
+            self.set_visible(not self.hidden)
+            self.load_children(section)
+            return
+
+        if dic is None:
+            return
+
+        dict_value = dic.get(self.key, self.value)
+
+        # NEW: MANAGE parameters for field
+        # They must start with a '+' and are
+        # value, hidden, save and addtionally
+        # all those valid for the widget itself
+
+        if type(dict_value) is dict and any(a.startswith('+') for a in dict_value):
+            value = dict_value.get("+value", self.value)
+            self.hidden = dict_value.get("+hidden", False)
+            self.set_visible(not self.hidden)
+            self.save = dict_value.get("+save", True)
+            clean_dict = {k.lstrip('+'): v for k, v in dict_value.items() if k not in ("+value", "+hidden", "+save")}
+            self.kwargs = shared_params({**self.kwargs, **clean_dict})
+            self.dict_way = True
+            self.mark_dirty()
+        else:
+            # OLD basic case
+            value = dict_value
 
+        self.set_value(value)
 
     '''
     def get_children(self, key):
@@ -426,14 +697,8 @@ class Elem(QObject):
 
         node = self
         for key in keys:
-            # found refers to to this part of the key
-            found = False
-            for child in node.child:  # type: Elem
-                if child.key == key:  # or c.pretty.lower() == p.lower():
-                    found = True
-                    node = child
-                    break
-            if not found:
+            node = node.child_index.get(key)
+            if node is None:
                 return None
         return node
 
@@ -448,11 +713,11 @@ class Elem(QObject):
         if key is None:
             return None  # , val=value)
 
-        path = key.split("/")
-        node = self.get_child(path)
+        node = self.tree.find(self, key)
         if node is not None:
             return node.value if node.value is not None else default
         elif create:
+            path = key.split("/")
             if self.get_child(path[0]) is None:
                 raise Exception("Dynamic field *must* be child of non-dynamic field ({} not found)".format(path[0]))
 
@@ -471,23 +736,28 @@ class Elem(QObject):
         if key is None:
             return None
 
-        create = kwargs.get("create", False)
-        kind = kwargs.get("kind", Kind.type2Kind(value))
-
-        path = key.split("/")
-        node = self.get_child(path)
+        node = self.tree.find(self, key)
         if node is not None:
             node.set_value(value)
-        elif create:
+        elif kwargs.get("create", False):
+            path = key.split("/")
             if self.get_child(path[0]) is None:
                 raise Exception("Dynamic field *must* be child of non-dynamic field ({} not found)".format(path[0]))
 
+            kind = kwargs.get("kind") or Kind.type2Kind(value)
             elem = self.add(key, kind)
             elem.set_value(value)
             return True
         else:
             raise Exception("Key {} not found".format(key))
 
+    def resolve(self, key):
+        if key.startswith("/"):
+            raise Exception("Paths must be relative to current node (remove heading '/')")
+        handle = Handle(self, key)
+        handle.get_elem()
+        return handle
+
     def get_param(self, key, default=None):
         return self.kwargs.get(key, default)
 
@@ -496,5 +766,27 @@ class Elem(QObject):
             self.tree_view_item.setHidden(not visible)
 
     def callback(self):
-        if self.kwargs.get("callback", None) and Callback.callbacks_enabled:
-            self.kwargs["callback"](self.key, self.value)
\ No newline at end of file
+        callback = self.kwargs.get("callback", None)
+        if callback and Callback.callbacks_enabled:
+            if self.tree.dispatcher is not None:
+                self.tree.dispatcher.submit(self, callback, self.value)
+            else:
+                self.run_callback(callback, self.value)
+
+    def run_callback(self, callback, value):
+        stats = self.tree.stats
+        if inspect.iscoroutinefunction(callback):
+            from easyconfig.aio import schedule, timed
+            coroutine = callback(self.key, value)
+            schedule(self.tree, coroutine if stats is None else timed(stats, self.get_path(), coroutine))
+            return
+        if stats is None:
+            callback(self.key, value)
+            return
+        start = time.perf_counter()
+        try:
+            callback(self.key, value)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.record("callback", elapsed)
+            stats.record("callback/" + self.get_path(), elapsed)
\ No newline at end of file
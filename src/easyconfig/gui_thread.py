@@ -0,0 +1,66 @@
+import sys
+import threading
+
+_invoker = None
+_gui_thread = None
+_lock = threading.Lock()
+
+
+def gui_application():
+    # The running Qt application, if Qt is in use at all
+    if "PyQt5.QtCore" not in sys.modules:
+        return None
+    from PyQt5.QtCore import QCoreApplication
+    return QCoreApplication.instance()
+
+
+def get_invoker(app):
+    global _invoker
+    from PyQt5 import sip
+    from PyQt5.QtCore import QObject, Qt, pyqtSignal, pyqtSlot
+
+    with _lock:
+        if _invoker is None or sip.isdeleted(_invoker):
+            class Invoker(QObject):
+                call = pyqtSignal(object)
+
+                def __init__(self):
+                    super().__init__()
+                    self.call.connect(self.run, Qt.QueuedConnection)
+
+                # A real slot: it is called in the thread of the object
+                @pyqtSlot(object)
+                def run(self, fn):
+                    fn()
+
+            _invoker = Invoker()
+            _invoker.moveToThread(app.thread())
+        return _invoker
+
+
+def in_gui_thread(app=None):
+    # True if there is no Qt application or this is its thread
+    global _gui_thread
+    app = app or gui_application()
+    if app is None:
+        return True
+    if _gui_thread is not None and _gui_thread[0] is app:
+        return _gui_thread[1] == threading.get_ident()
+    from PyQt5 import sip
+    from PyQt5.QtCore import QThread
+    if sip.unwrapinstance(QThread.currentThread()) != sip.unwrapinstance(app.thread()):
+        return False
+    # Python ident of the thread of app, cheaper to compare
+    _gui_thread = (app, threading.get_ident())
+    return True
+
+
+def call_in_gui_thread(fn):
+    # Run fn in the thread of the Qt application (later, from its event
+    # loop) or right away if there is no application or we are already there;
+    # the calls from other threads run in the order they were made
+    app = gui_application()
+    if in_gui_thread(app):
+        fn()
+    else:
+        get_invoker(app).call.emit(fn)
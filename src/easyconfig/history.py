@@ -0,0 +1,97 @@
+from collections import deque
+
+
+# Undo/redo of the values of a tree. A step is the list of the fields it
+# changed, (elem, old value, new value): the value before the change is
+# taken by Elem.set_value/update_value (see changing), so recording a step
+# only costs the fields that changed. At most limit steps are kept, and
+# older steps are dropped when the fields changed by all of them exceed
+# max_entries.
+class History:
+
+    def __init__(self, root, limit=100, max_entries=1000000):
+        self.root = root
+        self.limit = limit
+        self.max_entries = max_entries
+        self.undo_steps = deque()
+        self.redo_steps = deque()
+        self.entries = 0
+        self.restoring = False
+        # Elem -> value before the step being recorded
+        self.pending = {}
+        # Field edited in the last step, consecutive edits of a field are merged
+        self.last_elem = None
+
+    def changing(self, elem):
+        # Called before the value of elem is replaced
+        if not self.restoring and elem not in self.pending:
+            self.pending[elem] = elem.value
+
+    def record(self, elem=None):
+        pending, self.pending = self.pending, {}
+        if self.restoring:
+            return
+        step = [(e, old, e.value) for e, old in pending.items() if old != e.value]
+        if not step:
+            return
+        if elem is not None and elem is self.last_elem and self.undo_steps \
+                and len(step) == 1 and step[0][0] is elem:
+            # Same step as the previous edit of the field
+            previous = self.undo_steps.pop()
+            self.entries -= len(previous)
+            step = [(elem, previous[0][1], elem.value)]
+            if step[0][1] == step[0][2]:
+                self.last_elem = None
+                return
+        self.undo_steps.append(step)
+        self.entries += len(step)
+        self.trim()
+        self.last_elem = elem
+        self.redo_steps.clear()
+
+    def trim(self):
+        while self.undo_steps and (len(self.undo_steps) > self.limit or self.entries > self.max_entries):
+            self.entries -= len(self.undo_steps.popleft())
+
+    def can_undo(self):
+        return bool(self.undo_steps)
+
+    def can_redo(self):
+        return bool(self.redo_steps)
+
+    def undo(self, callbacks=True):
+        if not self.undo_steps:
+            return False
+        step = self.undo_steps.pop()
+        self.entries -= len(step)
+        self.redo_steps.append(step)
+        self.restore([(elem, old) for elem, old, _ in reversed(step)], callbacks)
+        return True
+
+    def redo(self, callbacks=True):
+        if not self.redo_steps:
+            return False
+        step = self.redo_steps.pop()
+        self.undo_steps.append(step)
+        self.entries += len(step)
+        self.restore([(elem, new) for elem, _, new in step], callbacks)
+        return True
+
+    def restore(self, values, callbacks):
+        # Set in one batch, which is not recorded
+        self.restoring = True
+        try:
+            with self.root.batch(callbacks):
+                for elem, value in values:
+                    elem.set_value(value)
+        finally:
+            self.restoring = False
+            self.pending = {}
+        self.last_elem = None
+
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+        self.entries = 0
+        self.pending = {}
+        self.last_elem = None
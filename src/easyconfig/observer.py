@@ -0,0 +1,35 @@
+import weakref
+
+
+# Minimal Qt-free replacement for pyqtSignal. Bound methods are held
+# through weak references so that connected widgets are disconnected
+# automatically once they are destroyed.
+class Signal:
+
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        if hasattr(slot, "__self__") and hasattr(slot, "__func__"):
+            self.slots.append(weakref.WeakMethod(slot, self._dead))
+        else:
+            self.slots.append(lambda: slot)
+
+    def disconnect(self, slot=None):
+        if slot is None:
+            self.slots.clear()
+        else:
+            self.slots = [ref for ref in self.slots if ref() != slot]
+
+    def _dead(self, ref):
+        if ref in self.slots:
+            self.slots.remove(ref)
+
+    def emit(self, *args):
+        for ref in list(self.slots):
+            slot = ref()
+            if slot is not None:
+                slot(*args)
+
+    def __len__(self):
+        return len(self.slots)
@@ -0,0 +1,160 @@
+import copy
+import dataclasses
+import os
+import typing
+
+from easyconfig import yaml_io
+from easyconfig.elem import EMPTY, Elem, params_signature, shared_params
+from easyconfig.kind import Kind
+
+SECTIONS = (Kind.SUBSECTION,)
+TYPES = {bool: Kind.CHECKBOX, int: Kind.INT, float: Kind.FLOAT, str: Kind.STR, list: Kind.LIST,
+         dict: Kind.DICTIONARY}
+
+
+def kind_of(name):
+    if isinstance(name, int) and not isinstance(name, bool):
+        return name
+    if name == "hidden":
+        return Kind.SUBSECTION
+    kind = getattr(Kind, str(name).upper(), None)
+    if not isinstance(kind, int) or kind in (Kind.ROOT, Kind.SECTION):
+        raise Exception("Unknown field type '{}'".format(name))
+    return kind
+
+
+def check_key(key):
+    if not isinstance(key, str) or not key or "/" in key:
+        raise Exception("Invalid key {!r}: keys must be non empty strings without '/'".format(key))
+
+
+# Description of an Elem tree, validated once, that can then be added to
+# any number of trees without going through the add* calls.
+# spec is a dictionary (or the YAML text or file of one) that maps each key
+# to either
+#   - a default value: a field whose type follows the value (see Kind.type2Kind,
+#     booleans are checkboxes)
+#   - {"type": "int", "default": 1, ...params}: a field of that type
+#     (the name of a Kind, e.g. "str", "password", "file_save")
+#   - {"type": "subsection", "fields": {...}, ...params} or just {...}: a subsection
+#     ("hidden" is a subsection with hidden=True). A mapping with a "type" key is
+#     always a field spec, so a subsection with a field named "type" must use the
+#     {"type": "subsection", "fields": {"type": ...}} form
+# or a dataclass, whose nested dataclasses are subsections and whose
+# field(metadata={"easyconfig": {...}}) are the parameters of the fields.
+class Schema:
+
+    def __init__(self, spec):
+        if dataclasses.is_dataclass(spec):
+            spec = self.dataclass_spec(spec)
+        elif isinstance(spec, str):
+            if os.path.isfile(spec):
+                with open(spec) as f:
+                    spec = f.read()
+            spec = yaml_io.load(spec) or {}
+        if not isinstance(spec, dict):
+            raise Exception("A schema must be a dictionary, a YAML mapping or a dataclass")
+        # (key, kind, params, children) with the parameters as given
+        self.fields = self.parse(spec)
+        # Compiled templates, one per default_params of the node they are added to
+        self.templates = {}
+
+    @classmethod
+    def dataclass_spec(cls, dataclass):
+        hints = typing.get_type_hints(dataclass)
+        spec = {}
+        for field in dataclasses.fields(dataclass):
+            kind = hints.get(field.name, field.type)
+            params = dict(field.metadata.get("easyconfig", {}))
+            if dataclasses.is_dataclass(kind):
+                params.setdefault("type", "subsection")
+                params["fields"] = cls.dataclass_spec(kind)
+            else:
+                if field.default is not dataclasses.MISSING:
+                    params.setdefault("default", field.default)
+                elif field.default_factory is not dataclasses.MISSING:
+                    params.setdefault("default", field.default_factory())
+                origin = typing.get_origin(kind) or kind
+                if "type" not in params:
+                    if origin not in TYPES:
+                        raise Exception("No field type for {} ({})".format(field.name, kind))
+                    params["type"] = TYPES[origin]
+            spec[field.name] = params
+        return spec
+
+    def parse(self, spec):
+        fields = []
+        for key, value in spec.items():
+            check_key(key)
+            if isinstance(value, dict) and "type" in value:
+                params = dict(value)
+                kind = kind_of(params.pop("type"))
+                children = params.pop("fields", None)
+                if value["type"] == "hidden":
+                    params["hidden"] = True
+                if kind in SECTIONS:
+                    fields.append((key, kind, params, self.parse(children or {})))
+                elif children is not None:
+                    raise Exception("Only subsections have fields ({})".format(key))
+                else:
+                    fields.append((key, kind, params, None))
+            elif isinstance(value, dict):
+                fields.append((key, Kind.SUBSECTION, {}, self.parse(value)))
+            else:
+                kind = Kind.CHECKBOX if type(value) is bool else Kind.type2Kind(value)
+                fields.append((key, kind, {"default": value}, None))
+        return fields
+
+    def template(self, default_params):
+        # The parameters of every node as the add* calls would set them
+        try:
+            signature = params_signature(default_params)
+            template = self.templates.get(signature)
+        except TypeError:
+            return self.compile(self.fields, default_params)
+        if template is None:
+            template = self.templates[signature] = self.compile(self.fields, default_params)
+        return template
+
+    def compile(self, fields, default_params):
+        template = []
+        for key, kind, params, children in fields:
+            if kind in SECTIONS:
+                params = {**default_params, **params}
+                node = Elem(key, kind)
+                node.set_default_params(default_params, params)
+                template.append((key, kind, shared_params(params), node.default_params,
+                                 self.compile(children, node.default_params)))
+            else:
+                params = {**default_params, **params}
+                inherited = Elem(key, kind)
+                inherited.set_default_params(default_params)
+                template.append((key, kind, shared_params(params), inherited.default_params, None))
+        return template
+
+    def build(self, node):
+        # Add the fields of the schema to node
+        template = self.template(node.default_params)
+        for key, kind, params, default_params, children in template:
+            if node.child_index.get(key) is not None:
+                raise Exception(f"Key '{key}' already exists")
+        self.instantiate(node, template)
+        node.tree.structure_changed()
+        node.mark_dirty()
+        return node
+
+    def instantiate(self, node, template):
+        if node.child_index is EMPTY:
+            node.child, node.child_index = [], {}
+        for key, kind, params, default_params, children in template:
+            elem = Elem(key, kind, node)
+            elem.kwargs = params
+            elem.save = params.get("save", True)
+            elem.hidden = params.get("hidden", False)
+            value = params.get("default", None)
+            elem.value = copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+            elem.default_params = default_params
+            node.child.append(elem)
+            node.child_index[elem.key] = elem
+            if children:
+                self.instantiate(elem, children)
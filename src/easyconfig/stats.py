@@ -0,0 +1,97 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+BUCKETS = 40
+NO_TIMER = nullcontext()
+
+
+# Count and latency distribution of one operation; bucket i counts the
+# durations between 2^(i-1) and 2^i microseconds
+class Histogram:
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * BUCKETS
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+        self.buckets[min(BUCKETS - 1, int(seconds * 1e6).bit_length())] += 1
+
+    def percentile(self, p):
+        # Upper bound of the bucket holding the p-th percentile
+        rank, seen = p / 100 * self.count, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min((1 << i) / 1e6, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            # Upper bound in microseconds -> count
+            "histogram": {1 << i: n for i, n in enumerate(self.buckets) if n},
+        }
+
+
+# Timings of a tree (see EasyConfig.enable_stats), nothing is measured
+# while tree.stats is None. Sinks are called with (name, seconds) for
+# every measure, e.g. to forward them to a metrics system.
+class Stats:
+
+    def __init__(self, sink=None):
+        self.histograms = {}
+        self.sinks = [sink] if sink is not None else []
+        self.lock = threading.Lock()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+
+    def record(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+        for sink in self.sinks:
+            sink(name, seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self.lock:
+            return {name: h.as_dict() for name, h in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+
+def timer(stats, name):
+    # with timer(tree.stats, "load"): ... measures only when stats are enabled
+    return stats.timer(name) if stats is not None else NO_TIMER
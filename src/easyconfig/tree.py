@@ -0,0 +1,108 @@
+from easyconfig.observer import Signal
+
+
+# Values changed inside a batch, notified once when the batch ends
+class Batch:
+
+    def __init__(self, callbacks=False):
+        self.callbacks = callbacks
+        self.depth = 0
+        # Elem -> None, an ordered set of the changed fields
+        self.changed = {}
+
+
+# State shared by all the Elem nodes of the same tree
+class Tree:
+
+    def __init__(self):
+        # (start node, path string) -> resolved Elem
+        self.paths = {}
+        self.generation = 0
+        # Incremented on every change of values or structure
+        self.revision = 0
+        self.batch = None
+        # History of the values, see EasyConfig.enable_history
+        self.history = None
+        # Timings, see EasyConfig.enable_stats
+        self.stats = None
+        # Runs the callbacks in other threads, see EasyConfig.enable_callback_threads
+        self.dispatcher = None
+        # Event loop of the async callbacks, see EasyConfig.set_event_loop
+        self.loop = None
+        # Emitted with the list of paths of the fields whose value changed
+        self.values_changed = Signal()
+        # Emitted with True/False around the update of many widgets at once
+        self.updates_suspended = Signal()
+
+    def begin_batch(self, callbacks=False):
+        if self.batch is None:
+            self.batch = Batch(callbacks)
+        self.batch.callbacks = self.batch.callbacks or callbacks
+        self.batch.depth += 1
+
+    def end_batch(self):
+        batch = self.batch
+        batch.depth -= 1
+        if batch.depth > 0:
+            return
+        self.batch = None
+        if self.history is not None:
+            self.history.record()
+        if not batch.changed:
+            return
+
+        changed = list(batch.changed)
+        self.updates_suspended.emit(True)
+        try:
+            for elem in changed:
+                if elem._value_changed is not None:
+                    elem._value_changed.emit()
+        finally:
+            self.updates_suspended.emit(False)
+
+        if batch.callbacks:
+            for elem in changed:
+                elem.callback()
+        if len(self.values_changed):
+            self.values_changed.emit([elem.get_path() for elem in changed])
+
+    def structure_changed(self):
+        self.paths.clear()
+        self.generation += 1
+
+    def find(self, node, key):
+        elem = self.paths.get((node, key))
+        if elem is None:
+            elem = node.get_child(key)
+            if elem is not None:
+                self.paths[(node, key)] = elem
+        return elem
+
+
+# Resolved path that can be held and reused to get/set a field
+class Handle:
+
+    def __init__(self, node, key):
+        self.node = node
+        self.key = key
+        self.elem = None
+        self.generation = None
+
+    def get_elem(self):
+        tree = self.node.tree
+        if self.generation != tree.generation:
+            elem = tree.find(self.node, self.key)
+            if elem is None:
+                raise Exception("Key {} not found".format(self.key))
+            self.elem, self.generation = elem, tree.generation
+        return self.elem
+
+    def get(self, default=None):
+        value = self.get_elem().value
+        return value if value is not None else default
+
+    def set(self, value):
+        self.get_elem().set_value(value)
+
+    def __repr__(self):
+        return "Handle({})".format(self.key)
@@ -0,0 +1,130 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import traceback
+
+from easyconfig.document import file_stat
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+EVENT = struct.Struct("iIII")
+
+
+def inotify_lib():
+    # libc with the inotify calls, None where not available
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+# Calls on_change (in its own thread) when the file changes, once per
+# burst of writes: with inotify (Linux) or polling the mtime every
+# interval seconds. The folder is watched so that files replaced by
+# rename, as most editors and EasyConfig.save do, are noticed too.
+class FileWatcher:
+
+    def __init__(self, filename, on_change, delay=0.2, interval=1.0):
+        self.filename = os.path.abspath(filename)
+        self.on_change = on_change
+        # Quiet time that ends a burst of writes
+        self.delay = delay
+        self.interval = interval
+        self.mode = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="easyconfig-watch", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def changed(self):
+        try:
+            self.on_change()
+        except Exception:
+            traceback.print_exc()
+
+    def run(self):
+        fd = self.inotify()
+        if fd is None:
+            self.mode = "polling"
+            self.poll()
+        else:
+            self.mode = "inotify"
+            try:
+                self.listen(fd)
+            finally:
+                os.close(fd)
+
+    def inotify(self):
+        libc = inotify_lib()
+        if libc is None:
+            return None
+        fd = libc.inotify_init()
+        if fd < 0:
+            return None
+        folder = os.path.dirname(self.filename).encode(sys.getfilesystemencoding())
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(fd, folder, mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def events(self, fd, timeout):
+        # True if the file was touched within timeout seconds
+        ready, _, _ = select.select([fd], [], [], timeout)
+        if not ready:
+            return False
+        data = os.read(fd, 64 * 1024)
+        name = os.path.basename(self.filename)
+        pos, touched = 0, False
+        while pos < len(data):
+            _, mask, _, length = EVENT.unpack_from(data, pos)
+            pos += EVENT.size
+            event_name = data[pos:pos + length].rstrip(b"\0").decode(sys.getfilesystemencoding(), "replace")
+            pos += length
+            touched = touched or event_name == name or mask & IN_Q_OVERFLOW
+        return touched
+
+    def listen(self, fd):
+        while not self.stopped.is_set():
+            if not self.events(fd, 0.5):
+                continue
+            while not self.stopped.is_set() and self.events(fd, self.delay):
+                pass
+            if not self.stopped.is_set():
+                self.changed()
+
+    def poll(self):
+        last = file_stat(self.filename)
+        while not self.stopped.wait(self.interval):
+            stat = file_stat(self.filename)
+            if stat == last:
+                continue
+            # Wait for the file to stay the same for delay seconds
+            while not self.stopped.wait(self.delay):
+                current = file_stat(self.filename)
+                if current == stat:
+                    break
+                stat = current
+            last = stat
+            if not self.stopped.is_set():
+                self.changed()
@@ -1,8 +1,10 @@
 import base64
+import math
 import sys
+import time
 
-from PyQt5 import QtGui
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5 import QtGui, sip
+from PyQt5.QtCore import Qt, pyqtSignal, QObject, QTimer, QAbstractListModel, QModelIndex
 from PyQt5.QtGui import QFont, QIntValidator, QDoubleValidator, QValidator
 from PyQt5.QtWidgets import (
     QPushButton,
@@ -13,9 +15,56 @@ from PyQt5.QtWidgets import (
     QLabel,
     QCheckBox,
     QComboBox,
-    QTextEdit, QSlider, QStyle, QListWidget, QInputDialog, QVBoxLayout, QSizePolicy
+    QTextEdit, QSlider, QStyle, QListView, QInputDialog, QVBoxLayout, QSizePolicy, QAbstractItemView
 )
 
+from easyconfig.gui_thread import call_in_gui_thread, in_gui_thread
+
+
+# Limits how often slot is called for a burst of changes (in ms):
+# throttle: at most once every throttle ms, the first change right away;
+# debounce: once the changes stopped for debounce ms.
+# With both, once the changes stopped for debounce ms but never sooner
+# than throttle ms after the previous call. The last change is always
+# delivered.
+class RateLimiter(QObject):
+
+    def __init__(self, slot, debounce=0, throttle=0, parent=None):
+        super().__init__(parent)
+        self.slot = slot
+        self.debounce = debounce
+        self.throttle = throttle
+        self.pending = False
+        self.last = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        # Coarse timers may fire up to 5% early
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.flush)
+
+    def trigger(self):
+        self.pending = True
+        now = time.monotonic() * 1000
+        if self.throttle and (self.last is None or now - self.last >= self.throttle):
+            self.fire()
+            return
+        # Rounded up, a timer firing early would break the throttle
+        remaining = 0 if self.last is None else math.ceil(self.throttle - (now - self.last))
+        if self.debounce:
+            self.timer.start(max(self.debounce, remaining))
+        elif not self.timer.isActive():
+            self.timer.start(max(0, remaining))
+
+    def fire(self):
+        self.pending = False
+        self.last = time.monotonic() * 1000
+        self.slot()
+
+    def flush(self):
+        self.timer.stop()
+        if self.pending:
+            self.fire()
+
 
 class InteractorWidget(QWidget):
     value_changed = pyqtSignal()
@@ -41,13 +90,51 @@ class InteractorWidget(QWidget):
         self.setFocusPolicy(Qt.TabFocus)
         self.widget = None
         self.emit_cb = True
+        self.limiter = None
         self.add_widget(elem.get_value())
 
+    def connect_value_changed(self, slot):
+        # slot is called for the changes made in the widget, as often as
+        # the debounce/throttle parameters (ms) allow; the widget itself
+        # always shows the current value
+        debounce, throttle = self.kwargs.get("debounce", 0), self.kwargs.get("throttle", 0)
+        if debounce or throttle:
+            self.limiter = RateLimiter(slot, debounce, throttle, self)
+            self.value_changed.connect(self.limiter.trigger)
+        else:
+            self.value_changed.connect(slot)
+
+    def flush_value_changed(self):
+        if self.limiter is not None:
+            self.limiter.flush()
+
+    def detach(self):
+        self.elem.elem_value_changed.disconnect(self.value_changed_external)
+        self.elem.elem_param_changed.disconnect(self.param_changed_external)
+        if self.elem.get_widget() is self:
+            self.elem.set_widget(None)
+
+    # The elem signals are emitted in the thread that set the value, the
+    # widget is only touched in the GUI thread
+
     def value_changed_external(self):
+        if not in_gui_thread():
+            call_in_gui_thread(self.value_changed_external)
+            return
+        # The Qt side may be gone (e.g. dialog closed) while the elem lives on
+        if sip.isdeleted(self):
+            self.detach()
+            return
         self.set_value(self.elem.get_value())
 
     def param_changed_external(self, kwargs):
         # print("param_changed_external", kwargs)
+        if not in_gui_thread():
+            call_in_gui_thread(lambda: self.param_changed_external(kwargs))
+            return
+        if sip.isdeleted(self):
+            self.detach()
+            return
         self.update(**kwargs)
 
     def set_value(self, value):
@@ -69,7 +156,7 @@ class InteractorWidget(QWidget):
         return self.get_common()
 
     def get_common(self):
-        return {"default", "save", "fmt", "pretty", "callback", "editable"}
+        return {"default", "save", "fmt", "pretty", "callback", "editable", "debounce", "throttle"}
 
     def check_kwargs(self):
         for arg in self.kwargs:
@@ -168,13 +255,55 @@ class DoubleLabel(InteractorWidget):
                 self.widget2.setText(str(value[1]))
 
 
+# The values of a List field, as they are (strings are only made for
+# the rows shown); rows are added, changed and removed one at a time
+class ListModel(QAbstractListModel):
+
+    def __init__(self, values=None, parent=None):
+        super().__init__(parent)
+        self.values = list(values) if values is not None else []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.values)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role in (Qt.DisplayRole, Qt.EditRole) and index.isValid():
+            return str(self.values[index.row()])
+        return None
+
+    def set_values(self, values):
+        self.beginResetModel()
+        self.values = list(values) if values is not None else []
+        self.endResetModel()
+
+    def insert_value(self, row, value):
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.values.insert(row, value)
+        self.endInsertRows()
+
+    def set_value(self, row, value):
+        self.values[row] = value
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def remove_value(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.values[row]
+        self.endRemoveRows()
+
+
 class List(InteractorWidget):
     def __init__(self, elem):
         super().__init__(elem)
         self.value_type = elem.kwargs.get("type", "str")
 
+    def current_row(self):
+        index = self.widget.currentIndex()
+        return index.row() if index.isValid() else None
+
     def ask_value(self): # retry submit
-        default = self.widget.currentItem().text() if self.widget.currentItem() is not None else ""
+        row = self.current_row()
+        default = self.model.data(self.model.index(row)) if row is not None else ""
         if self.value_type == "str":
             default = str(default) if default is not None else ""
             text, ok = QInputDialog.getText(None, "Input", "Enter item", QLineEdit.Normal, default)
@@ -198,20 +327,30 @@ class List(InteractorWidget):
             text, ok = QFileDialog.getOpenFileName(None, "Open file", default, "All files (*)")
             return text, ok
 
+    def parse(self, text):
+        # Only the values entered by the user are parsed
+        if self.value_type == "int":
+            return int(text)
+        elif self.value_type == "float":
+            return float(text)
+        return text
+
     def add_item(self):
         text, ok = self.ask_value()
         if ok:
-            self.widget.addItem(str(text))
+            self.model.insert_value(len(self.model.values), self.parse(text))
 
     def del_item(self):
-        if self.widget.currentItem():
-            self.widget.takeItem(self.widget.currentRow())
+        row = self.current_row()
+        if row is not None:
+            self.model.remove_value(row)
 
     def edit_item(self):
-        if self.widget.currentItem():
+        row = self.current_row()
+        if row is not None:
             text, ok = self.ask_value()
             if ok:
-                self.widget.currentItem().setText(text)
+                self.model.set_value(row, self.parse(text))
 
     def add_widget(self, value):
         helper = QWidget()
@@ -240,13 +379,17 @@ class List(InteractorWidget):
         h_layout.addWidget(button_del)
         h_layout.setAlignment(Qt.AlignLeft)
 
-        self.widget = QListWidget()
+        # Only the visible rows are ever turned into text
+        self.model = ListModel(value, self)
+        self.widget = QListView()
+        self.widget.setUniformItemSizes(True)
+        self.widget.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.widget.setModel(self.model)
         layout.addWidget(self.widget)
 
         if self.kwargs.get("editable", True):
             layout.addLayout(h_layout)
 
-        self.widget.addItems([str(v) for v in value] if value is not None else [])
         self.layout.addWidget(helper)
         self.widget.setMaximumHeight(self.kwargs.get("height", 100))
         self.widget.setFont(QFont("Courier New", 10))
@@ -255,26 +398,18 @@ class List(InteractorWidget):
         return self.get_common().union(["height", "frame", "type"])
 
     def get_value(self):
-        if self.value_type == "int":
-            return [int(self.widget.item(i).text()) for i in range(self.widget.count())]
-        elif self.value_type == "float":
-            return [float(self.widget.item(i).text()) for i in range(self.widget.count())]
-        return [self.widget.item(i).text() for i in range(self.widget.count())]
+        return list(self.model.values)
 
     def set_value(self, value):
-        self.widget.clear()
-        if value is not None:
-            self.widget.addItems(value)
-
+        self.model.set_values(value)
 
     def update(self, **kwargs) -> None:
         # print("List update", kwargs)
         if "items" in kwargs:
-            self.widget.clear()
-            self.widget.addItems(kwargs["items"])
+            self.model.set_values(kwargs["items"])
 
         if "on_selection" in kwargs:
-            self.widget: QListWidget
+            self.widget: QListView
             self.widget.doubleClicked.connect(kwargs["on_selection"])
 
 class EditBox(String):
@@ -0,0 +1,43 @@
+import yaml
+
+# Use the libyaml bindings when PyYAML was built with them
+try:
+    from yaml import CSafeLoader as SafeLoader, CDumper as FastDumper
+    BACKEND = "libyaml"
+except ImportError:
+    from yaml import SafeLoader
+    FastDumper = None
+    BACKEND = "python"
+
+
+def backend():
+    return BACKEND
+
+
+def load(stream):
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def dump(data, stream=None):
+    # libyaml folds escaped and long scalars differently from the pure
+    # Python emitter: only use it when the output is known to be identical
+    dumper = FastDumper if FastDumper is not None and is_plain(data) else yaml.Dumper
+    return yaml.dump(data, stream, Dumper=dumper, sort_keys=False)
+
+
+def is_plain(data):
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            if not (item.isascii() and item.isprintable()):
+                return False
+        elif type(item) is dict:
+            for k, v in item.items():
+                if type(k) is str and not (0 < len(k) <= 64 and k.isascii() and k.isprintable()):
+                    return False
+                stack.append(k)
+                stack.append(v)
+        elif type(item) in (list, tuple):
+            stack.extend(item)
+    return True
@@ -7,4 +7,45 @@
     - https://docs.pytest.org/en/stable/writing_plugins.html
 """
 
-# import pytest
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    # The widgets are built without a display
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    widgets = pytest.importorskip("PyQt5.QtWidgets")
+    return widgets.QApplication.instance() or widgets.QApplication([])
+
+
+def wait_until(app, condition, timeout=5.0):
+    # Process the Qt events (if there is an application) until condition() holds
+    import time
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        if app is not None:
+            app.processEvents()
+        time.sleep(0.001)
+    return condition()
+
+
+def pause(seconds):
+    # time.sleep, still applying what other threads post to the GUI thread
+    from easyconfig.gui_thread import gui_application
+    wait_until(gui_application(), lambda: False, seconds)
+
+
+def result(future, timeout=5.0):
+    # future.result(timeout); with a QApplication the loads are applied in
+    # its thread, so its events are processed meanwhile
+    from easyconfig.gui_thread import gui_application
+    wait_until(gui_application(), future.done, timeout)
+    return future.result(0)
+
+
+def exception(future, timeout=5.0):
+    from easyconfig.gui_thread import gui_application
+    wait_until(gui_application(), future.done, timeout)
+    return future.exception(0)
@@ -0,0 +1,119 @@
+import pytest
+
+from easyconfig.EasyConfig import EasyConfig
+from easyconfig.kind import Kind
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+
+def describe(node):
+    # Everything add sets on the nodes, in the order of the children
+    return [(c.key, c.kind, dict(c.kwargs), dict(c.default_params), c.value, c.save, c.hidden,
+             describe(c) if c.kind == Kind.SUBSECTION else None) for c in node.child]
+
+
+FIELDS = [
+    ("name", Kind.STR, {"default": "Bob", "pretty": "Name"}),
+    ("info/age", Kind.INT, {"default": 30, "max": 120}),
+    ("info/deep/flag", Kind.CHECKBOX, {"default": True, "save": False}),
+    ("info/account", Kind.STR, {"default": "x", "hidden": True}),
+    ("job", Kind.SUBSECTION, {"pretty": "Job", "editable": False}),
+    ("job/salary", Kind.INT, {"default": 1}),
+    ("/top", Kind.FLOAT),
+]
+
+
+def added_one_by_one(**defaults):
+    config = EasyConfig(**defaults)
+    for field in FIELDS:
+        key, kind, kwargs = field[0], field[1], dict(field[2]) if len(field) > 2 else {}
+        if kind == Kind.SUBSECTION:
+            config.root().addSubSection(key, **kwargs)
+        else:
+            config.root().add(key, kind, **kwargs)
+    return config
+
+
+@pytest.mark.parametrize("defaults", [{}, {"editable": True}])
+def test_add_many_as_add(defaults):
+    config = EasyConfig(**defaults)
+    created = config.root().add_many(FIELDS)
+    assert [elem.get_path() for elem in created] == \
+        ["name", "info/age", "info/deep/flag", "info/account", "job", "job/salary", "top"]
+    assert describe(config.root()) == describe(added_one_by_one(**defaults).root())
+
+
+def test_add_many_creates_path_subsections():
+    config = EasyConfig()
+    root = config.root()
+    root.add_many([("a/b/x", Kind.INT, {"default": 1}), ("a/y", Kind.STR)])
+    assert [c.key for c in root.child] == ["a"]
+    assert [c.key for c in root.get_child("a").child] == ["b", "y"]
+    assert root.get_child("a/b").kind == Kind.SUBSECTION
+    assert root.get("a/b/x") == 1
+    # The new paths resolve, also through the cache
+    assert root.resolve("a/b/x").get() == 1
+
+
+def test_add_many_completes_existing_subsections():
+    config = EasyConfig()
+    root = config.root()
+    root.addSubSection("a").addInt("x", default=1)
+    root.add_many([("a/y", Kind.INT, {"default": 2}), ("a/b/z", Kind.INT, {"default": 3})])
+    assert [c.key for c in root.get_child("a").child] == ["x", "y", "b"]
+    assert root.get("a/b/z") == 3
+
+
+@pytest.mark.parametrize("fields", [
+    [("new", Kind.INT), ("x", Kind.INT)],
+    [("new", Kind.INT), ("s/z", Kind.INT), ("new", Kind.STR)],
+    [("s/z", Kind.INT), ("a/x", Kind.INT)],
+])
+def test_add_many_rejects_duplicates_leaving_the_tree_untouched(fields):
+    config = EasyConfig()
+    root = config.root()
+    root.addInt("x", default=1)
+    root.addSubSection("a").addInt("x", default=2)
+    before = describe(root)
+    revision = root.tree.revision
+    with pytest.raises(Exception, match="already exists"):
+        root.add_many(fields)
+    assert describe(root) == before
+    assert root.tree.revision == revision
+    assert root.get_child("new") is None and root.get_child("s") is None
+
+
+def test_add_many_key_from_root_only():
+    config = EasyConfig()
+    section = config.root().addSubSection("a")
+    with pytest.raises(Exception):
+        section.add_many([("/x", Kind.INT)])
+
+
+def test_add_from_dict_as_add():
+    config = EasyConfig()
+    config.root().add_from_dict({
+        "name": {"type": "str", "default": "Bob", "pretty": "Name"},
+        "info": {"type": "subsection", "fields": {
+            "age": {"type": "int", "default": 30, "max": 120},
+            "deep": {"type": "subsection", "fields": {
+                "flag": {"type": "checkbox", "default": True, "save": False}}},
+            "account": {"type": "str", "default": "x", "hidden": True}}},
+        "job": {"type": "subsection", "pretty": "Job", "editable": False, "fields": {
+            "salary": {"type": "int", "default": 1}}},
+        "top": {"type": "float"},
+    })
+    assert describe(config.root()) == describe(added_one_by_one().root())
+
+
+def test_add_from_dict_completes_existing_subsections():
+    config = EasyConfig()
+    root = config.root()
+    root.addSubSection("info").addInt("age", default=30)
+    root.add_from_dict({"info": {"type": "subsection", "fields": {"name": "Bob"}}, "x": 1})
+    assert [c.key for c in root.get_child("info").child] == ["age", "name"]
+    assert (root.get("info/name"), root.get("x")) == ("Bob", 1)
+    with pytest.raises(Exception, match="already exists"):
+        root.add_from_dict({"info": {"type": "subsection", "fields": {"age": 1}}})
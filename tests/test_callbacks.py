@@ -0,0 +1,145 @@
+import threading
+import time
+
+from easyconfig.EasyConfig import EasyConfig
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+
+def build(callback):
+    config = EasyConfig()
+    config.root().addInt("x", default=0, callback=callback)
+    config.root().addInt("y", default=0, callback=callback)
+    return config
+
+
+def test_slow_callback_delivers_in_order_and_coalesces():
+    release = threading.Event()
+    delivered = []
+
+    def callback(key, value):
+        if not delivered:
+            release.wait(5)
+        delivered.append((key, value, threading.current_thread()))
+
+    config = build(callback)
+    config.enable_callback_threads()
+    try:
+        for value in range(1, 101):
+            config.root().set("x", value)
+        # The first callback is still running: the others are coalesced
+        assert config.wait_callbacks(0.05) is False
+        release.set()
+        assert config.wait_callbacks(5)
+    finally:
+        config.disable_callback_threads()
+
+    assert [value for _, value, _ in delivered] == [1, 100]
+    assert all(thread is not threading.main_thread() for _, _, thread in delivered)
+
+
+def test_callbacks_of_a_field_run_one_at_a_time_in_order():
+    running = set()
+    overlapped = []
+    delivered = []
+    lock = threading.Lock()
+
+    def callback(key, value):
+        with lock:
+            if key in running:
+                overlapped.append(key)
+            running.add(key)
+        time.sleep(0.001)
+        with lock:
+            running.discard(key)
+            delivered.append((key, value))
+
+    config = build(callback)
+    config.enable_callback_threads(max_workers=4)
+    try:
+        for value in range(1, 201):
+            config.root().set("x", value)
+            config.root().set("y", -value)
+        assert config.wait_callbacks(10)
+    finally:
+        config.disable_callback_threads()
+
+    assert overlapped == []
+    for key, last in (("x", 200), ("y", -200)):
+        values = [value for k, value in delivered if k == key]
+        assert values == sorted(values, key=abs)
+        assert values[-1] == last
+
+
+def test_wait_returns_once_idle():
+    active = []
+
+    def callback(key, value):
+        active.append(value)
+        time.sleep(0.05)
+        active.remove(value)
+
+    config = build(callback)
+    config.enable_callback_threads()
+    try:
+        config.root().set("x", 1)
+        config.root().set("y", 2)
+        assert config.wait_callbacks(5)
+        assert active == []
+    finally:
+        config.disable_callback_threads()
+
+
+def test_wait_without_threads():
+    delivered = []
+    config = build(lambda key, value: delivered.append(value))
+    config.root().set("x", 1)
+    assert delivered == [1]
+    assert config.wait_callbacks(0)
+
+
+def test_disable_waits_for_pending_callbacks():
+    delivered = []
+
+    def callback(key, value):
+        time.sleep(0.02)
+        delivered.append(value)
+
+    config = build(callback)
+    config.enable_callback_threads()
+    config.root().set("x", 1)
+    config.disable_callback_threads()
+    assert delivered == [1]
+    config.root().set("x", 2)
+    assert delivered == [1, 2]
+
+
+def test_pool_callback_setting_a_value_updates_its_widget_in_gui_thread(qapp):
+    from conftest import wait_until
+
+    config = EasyConfig()
+    root = config.root()
+    root.addInt("x", default=0, callback=lambda key, value: root.set("y", value * 2))
+    y = root.addInt("y", default=0)
+    widget = config.get_widget()
+    field = y.get_widget()
+    threads = []
+    set_value = field.set_value
+
+    def recording(value):
+        threads.append(threading.current_thread())
+        set_value(value)
+
+    field.set_value = recording
+    config.enable_callback_threads()
+    try:
+        root.set("x", 21)
+        assert config.wait_callbacks(5)
+    finally:
+        config.disable_callback_threads()
+
+    assert wait_until(qapp, lambda: field.get_value() == 42)
+    assert threads == [threading.main_thread()]
+    widget.close()
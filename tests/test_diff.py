@@ -0,0 +1,110 @@
+from easyconfig.diff import Diff, diff_dicts
+from easyconfig.EasyConfig import EasyConfig
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+
+def build():
+    config = EasyConfig()
+    root = config.root()
+    info = root.addSubSection("info")
+    info.addString("name", default="Bob")
+    info.addInt("age", default=30)
+    root.addSubSection("job").addInt("salary", default=1)
+    root.addInt("top", default=3)
+    return config
+
+
+CONTENT = {"info": {"name": "Bob", "age": 30}, "job": {"salary": 1}, "top": 3}
+
+
+def test_diff_dicts_paths():
+    a = {"s": {"x": 1, "y": 2, "deep": {"z": 3}}, "gone": 1, "same": {"k": [1, 2]}}
+    b = {"s": {"x": 1, "y": 5, "deep": {"z": 4}, "new": 0}, "added": {"a": 1}, "same": {"k": [1, 2]}}
+    result = diff_dicts(a, b)
+    assert result.added == ["s/new", "added"]
+    assert result.removed == ["gone"]
+    assert sorted(result.changed) == ["s/deep/z", "s/y"]
+    assert result
+
+
+def test_diff_dicts_section_replaced_by_value():
+    result = diff_dicts({"s": {"x": 1}}, {"s": 1})
+    assert result.changed == ["s"]
+
+
+def test_diff_dicts_identical():
+    a = {"s{}".format(i): {"f{}".format(j): j for j in range(10)} for i in range(10)}
+    b = {"s{}".format(i): {"f{}".format(j): j for j in range(10)} for i in range(10)}
+    assert not diff_dicts(a, b)
+    assert diff_dicts(a, b) == Diff()
+
+
+def test_diff_dicts_compares_plus_value():
+    a = {"x": {"+value": 1, "+hidden": True}, "y": 2, "z": {"+value": 3}}
+    b = {"x": 1, "y": {"+value": 2, "+save": True}, "z": {"+value": 4}}
+    result = diff_dicts(a, b)
+    assert result.changed == ["z"]
+    assert not result.added and not result.removed
+
+
+def test_diff_against_dictionary():
+    config = build()
+    assert not config.diff(CONTENT)
+    # The easyconfig section of the files is not part of the tree
+    assert not config.diff(dict(CONTENT, easyconfig={"expanded-root": "01"}))
+    result = config.diff({"info": {"name": "Zed"}, "job": {"salary": 1, "bonus": 2}, "top": 3})
+    assert result.added == ["job/bonus"]
+    assert result.removed == ["info/age"]
+    assert result.changed == ["info/name"]
+
+
+def test_diff_of_a_node():
+    config = build()
+    info = config.root().get_child("info")
+    assert not config.diff({"name": "Bob", "age": 30}, node=info)
+    assert config.diff({"name": "Bob", "age": 31}, node=info).changed == ["age"]
+    assert info.diff({"name": "Bob", "age": 30, "x": 1}).added == ["x"]
+
+
+def test_diff_against_another_config():
+    config, other = build(), build()
+    assert not config.diff(other)
+    other.root().set("job/salary", 2)
+    assert config.diff(other).changed == ["job/salary"]
+    assert config.diff(other, node=config.root().get_child("job")).changed == ["salary"]
+    assert config.diff(other.root()).changed == ["job/salary"]
+
+
+def test_diff_against_file(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    config = build()
+    config.save(filename)
+    assert not config.diff(filename)
+    assert not config.diff(tmp_path / "c.yaml")
+
+    config.root().set("info/age", 31)
+    assert config.diff(filename).changed == ["info/age"]
+    assert config.diff(filename, node=config.root().get_child("info")).changed == ["age"]
+
+
+def test_diff_against_file_does_not_cache_it(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    config = build()
+    config.save(filename)
+    document = config.documents[filename]
+    with open(filename, "w") as f:
+        f.write("top: 4\n")
+    assert "top" in config.diff(filename).changed
+    assert config.documents[filename] is document
+
+
+def test_diff_sees_values_not_saved_yet_as_cached_sections_change():
+    config = build()
+    content = {}
+    config.root().getDictionary(content)
+    assert not config.diff(content)
+    config.root().set("top", 4)
+    assert config.diff(content).changed == ["top"]
@@ -0,0 +1,156 @@
+import os
+
+import pytest
+
+from easyconfig.document import Document, atomic_write
+from easyconfig.EasyConfig import EasyConfig
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+
+def spliced(text, key, value):
+    document = Document(text)
+    document.set(key, value)
+    return document.text
+
+
+def test_set_keeps_comments_of_next_section():
+    text = "a:\n  x: 1\n\n# Settings of b\nb:\n  y: 2\n"
+    assert spliced(text, "a", {"x": 5}) == "a:\n  x: 5\n\n# Settings of b\nb:\n  y: 2\n"
+
+
+def test_set_keeps_head_and_other_sections():
+    text = "# my comment\nlist: [x, y]   # flow\ninfo:\n  name: Bob  # keep?\njob:\n  salary: 1\n"
+    assert spliced(text, "job", {"salary": 2}) == \
+        "# my comment\nlist: [x, y]   # flow\ninfo:\n  name: Bob  # keep?\njob:\n  salary: 2\n"
+
+
+def test_set_last_section_keeps_tail():
+    text = "a: 1\nb:\n  y: 2\n  # indented, part of b\n\n# end of file\n"
+    assert spliced(text, "b", {"y": 3}) == "a: 1\nb:\n  y: 3\n\n# end of file\n"
+
+
+def test_set_multiline_flow_value():
+    text = "a: [1,\n  2\n  ]\n# b\nb: 1\n"
+    assert spliced(text, "a", [3]) == "a:\n- 3\n# b\nb: 1\n"
+
+
+def test_set_new_key_before_tail():
+    assert spliced("a: 1\n\n# end\n", "z", 2) == "a: 1\nz: 2\n\n# end\n"
+
+
+def test_set_new_key_without_final_newline():
+    assert spliced("a: 1", "b", 2) == "a: 1\nb: 2\n"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", "b: 2\n"),
+    ("# only a comment", "# only a comment\nb: 2\n"),
+])
+def test_set_new_key_in_empty_document(text, expected):
+    assert spliced(text, "b", 2) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "{a: 1, b: {y: 2}}\n",
+    "base: &base\n  y: 2\nb: *base\n",
+    "- 1\n- 2\n",
+])
+def test_set_falls_back_to_full_rewrite(text):
+    document = Document(text)
+    assert not document.split()
+    document.set("a", 5)
+    assert document.get("a") == 5
+    if text.startswith("{"):
+        assert document.get("b") == {"y": 2}
+
+
+def test_get():
+    document = Document("a:\n  x: 1\n# b\nb: [1, 2]\n")
+    assert document.get("a") == {"x": 1}
+    assert document.get("b") == [1, 2]
+    assert document.get("c", 3) == 3
+
+
+def test_atomic_write_keeps_mode(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    with open(filename, "w") as f:
+        f.write("a: 1\n")
+    os.chmod(filename, 0o640)
+    atomic_write(filename, "a: 2\n")
+    assert open(filename).read() == "a: 2\n"
+    assert os.stat(filename).st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["c.yaml"]
+
+
+def test_atomic_write_through_symlink(tmp_path):
+    real = tmp_path / "real.yaml"
+    link = tmp_path / "link.yaml"
+    real.write_text("a: 1\n")
+    link.symlink_to("real.yaml")
+    atomic_write(str(link), "a: 2\n")
+    assert link.is_symlink()
+    assert real.read_text() == "a: 2\n"
+    assert sorted(os.listdir(tmp_path)) == ["link.yaml", "real.yaml"]
+
+
+def build():
+    config = EasyConfig()
+    info = config.root().addSubSection("info")
+    info.addString("name", default="Bob")
+    info.addInt("age", default=30)
+    job = config.root().addSubSection("job")
+    job.addInt("salary", default=1)
+    return config
+
+
+def test_partial_save_round_trip(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    config = build()
+    config.save(filename)
+    config.root().set("info/age", 99)
+    config.root().set("job/salary", 5)
+    config.save(filename, node=config.root().get_child("info"))
+
+    other = build()
+    other.load(filename)
+    assert other.root().get("info/age") == 99
+    # Only the section of the node is written
+    assert other.root().get("job/salary") == 1
+
+
+def test_partial_save_keeps_comments(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    with open(filename, "w") as f:
+        f.write("# top\ninfo:\n  name: Bob\n  age: 30\n\n# the job\njob:\n  salary: 1  # per month\n")
+    config = build()
+    config.load(filename)
+    config.root().set("info/age", 31)
+    config.save(filename, node=config.root().get_child("info"))
+    assert open(filename).read() == \
+        "# top\ninfo:\n  name: Bob\n  age: 31\n\n# the job\njob:\n  salary: 1  # per month\n"
+
+
+def test_partial_save_after_external_edit(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    config = build()
+    config.save(filename)
+    with open(filename, "a") as f:
+        f.write("extra: 1\n")
+    config.root().set("job/salary", 2)
+    config.save(filename, node=config.root().get_child("job"))
+    document = Document.read(filename)
+    assert document.get("extra") == 1
+    assert document.get("job") == {"salary": 2}
+    assert document.get("info") == {"name": "Bob", "age": 30}
+
+
+def test_partial_save_new_section(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    with open(filename, "w") as f:
+        f.write("info:\n  name: Bob\n  age: 30\n")
+    config = build()
+    config.save(filename, node=config.root().get_child("job"))
+    assert open(filename).read() == "info:\n  name: Bob\n  age: 30\njob:\n  salary: 1\n"
@@ -0,0 +1,166 @@
+from easyconfig.EasyConfig import EasyConfig
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+
+def build(fields=3, **kwargs):
+    config = EasyConfig()
+    section = config.root().addSubSection("s")
+    for i in range(fields):
+        section.addInt("f{}".format(i), default=0, **kwargs)
+    return config
+
+
+def values(config, fields=3):
+    return [config.root().get("s/f{}".format(i)) for i in range(fields)]
+
+
+def test_undo_redo_set():
+    config = build()
+    root = config.root()
+    history = config.enable_history()
+    assert not config.undo()
+    root.set("s/f0", 1)
+    root.set("s/f1", 2)
+    root.set("s/f0", 3)
+    assert values(config) == [3, 2, 0]
+
+    assert config.undo() and values(config) == [1, 2, 0]
+    assert config.undo() and values(config) == [1, 0, 0]
+    assert config.undo() and values(config) == [0, 0, 0]
+    assert not config.undo()
+    assert config.redo() and values(config) == [1, 0, 0]
+    assert config.redo() and values(config) == [1, 2, 0]
+    assert history.can_redo()
+
+    # A new change drops the steps that could be redone
+    root.set("s/f2", 5)
+    assert not history.can_redo()
+    assert not config.redo()
+    assert config.undo() and values(config) == [1, 2, 0]
+
+
+def test_undo_runs_callbacks():
+    delivered = []
+    config = build(callback=lambda key, value: delivered.append((key, value)))
+    config.enable_history()
+    config.root().set("s/f1", 4)
+    delivered.clear()
+    config.undo()
+    assert delivered == [("f1", 0)]
+    config.redo(callbacks=False)
+    assert delivered == [("f1", 0)]
+    assert values(config) == [0, 4, 0]
+
+
+def test_undo_is_not_recorded():
+    config = build()
+    history = config.enable_history()
+    config.root().set("s/f0", 1)
+    config.undo()
+    assert not history.can_undo()
+    assert history.entries == 0
+
+
+def test_widget_edits_of_a_field_are_merged():
+    config = build()
+    history = config.enable_history()
+    elem = config.root().get_child("s/f0")
+    # As the widget does while a value is edited
+    for value in range(1, 6):
+        elem.update_value(value)
+    assert len(history.undo_steps) == 1
+    other = config.root().get_child("s/f1")
+    other.update_value(7)
+    elem.update_value(8)
+    assert len(history.undo_steps) == 3
+
+    assert config.undo() and values(config) == [5, 7, 0]
+    assert config.undo() and values(config) == [5, 0, 0]
+    assert config.undo() and values(config) == [0, 0, 0]
+
+
+def test_widget_edit_back_to_the_start_is_no_step():
+    config = build()
+    history = config.enable_history()
+    elem = config.root().get_child("s/f0")
+    elem.update_value(1)
+    elem.update_value(0)
+    assert not history.can_undo()
+
+
+def test_sets_are_not_merged():
+    config = build()
+    history = config.enable_history()
+    for value in range(1, 4):
+        config.root().set("s/f0", value)
+    assert len(history.undo_steps) == 3
+
+
+def test_batch_is_one_step():
+    config = build()
+    history = config.enable_history()
+    config.root().set_values({"s/f0": 1, "s/f1": 2, "s/f2": 3})
+    with config.root().batch():
+        config.root().set("s/f0", 4)
+        config.root().set("s/f0", 5)
+    assert len(history.undo_steps) == 2
+    assert config.undo() and values(config) == [1, 2, 3]
+    assert config.undo() and values(config) == [0, 0, 0]
+
+
+def test_load_is_one_step(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    with open(filename, "w") as f:
+        f.write("s:\n  f0: 1\n  f1: 2\n  f2: 3\n")
+    config = build()
+    history = config.enable_history()
+    config.load(filename)
+    assert values(config) == [1, 2, 3]
+    assert len(history.undo_steps) == 1
+    assert config.undo() and values(config) == [0, 0, 0]
+    assert config.redo() and values(config) == [1, 2, 3]
+
+
+def test_trim_by_limit():
+    config = build()
+    history = config.enable_history(limit=3)
+    for value in range(1, 11):
+        config.root().set("s/f0", value)
+    assert len(history.undo_steps) == 3
+    while config.undo():
+        pass
+    assert values(config) == [7, 0, 0]
+
+
+def test_trim_by_max_entries():
+    config = build()
+    history = config.enable_history(max_entries=5)
+    for value in range(1, 4):
+        config.root().set_values({"s/f0": value, "s/f1": value, "s/f2": value})
+    # Three fields per step: only one step fits
+    assert len(history.undo_steps) == 1
+    assert history.entries == 3
+    config.undo()
+    assert values(config) == [2, 2, 2]
+
+
+def test_step_cost_does_not_depend_on_section_width():
+    config = build(fields=1000)
+    history = config.enable_history()
+    config.root().set("s/f10", 1)
+    assert history.entries == 1
+
+
+def test_clear():
+    config = build()
+    history = config.enable_history()
+    config.root().set("s/f0", 1)
+    history.clear()
+    assert not history.can_undo() and not history.can_redo()
+    assert not config.undo()
+    config.disable_history()
+    config.root().set("s/f0", 2)
+    assert not config.undo()
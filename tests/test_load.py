@@ -0,0 +1,127 @@
+import copy
+
+import pytest
+
+from easyconfig.callbacks import Callback
+from easyconfig.EasyConfig import EasyConfig
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+
+def build(callback=None):
+    config = EasyConfig()
+    root = config.root()
+    info = root.addSubSection("info")
+    info.addString("name", default="Bob", callback=callback)
+    info.addInt("age", default=30, callback=callback)
+    job = root.addSubSection("job")
+    job.addInt("salary", default=1, callback=callback)
+    job.addSubSection("deep").addInt("x", default=0)
+    root.addInt("top", default=3)
+    return config
+
+
+def test_load_values():
+    config = build()
+    root = config.root()
+    data = {"info": {"name": "Zed", "age": 44, "unknown": 1}, "job": {"deep": {"x": 5}}, "top": 4}
+    original = copy.deepcopy(data)
+    root.load(data)
+    assert [root.get(k) for k in ("info/name", "info/age", "job/salary", "job/deep/x", "top")] == \
+        ["Zed", 44, 1, 5, 4]
+    assert data == original
+
+
+def test_load_skips_values_of_the_wrong_shape():
+    config = build()
+    root = config.root()
+    root.load({"info": "not a section", "job": {"deep": 7, "salary": 9}})
+    assert root.get("info/name") == "Bob"
+    assert root.get("job/deep/x") == 0
+    assert root.get("job/salary") == 9
+
+
+def test_load_dict_way_fields(tmp_path):
+    config = build()
+    root = config.root()
+    root.load({"info": {"name": {"+value": "Zed", "+hidden": True, "+save": True}},
+               "job": {"salary": {"+value": 7, "+save": False}}})
+    name, salary = root.get_child("info/name"), root.get_child("job/salary")
+    assert (name.value, name.hidden, name.save, name.dict_way) == ("Zed", True, True, True)
+    assert (salary.value, salary.hidden, salary.save) == (7, False, False)
+
+    filename = str(tmp_path / "c.yaml")
+    config.save(filename)
+    other = build()
+    other.load(filename)
+    assert other.root().get_child("info/name").hidden
+    assert other.root().get("info/name") == "Zed"
+    # Not saved
+    assert other.root().get("job/salary") == 1
+
+
+def test_load_dict_way_widget_parameters():
+    config = build()
+    config.root().load({"info": {"age": {"+value": 50, "+max": 99}}})
+    age = config.root().get_child("info/age")
+    assert age.value == 50
+    assert age.kwargs["max"] == 99
+    assert age.kwargs["default"] == 30
+
+
+def test_load_hidden_section():
+    config = build()
+    config.root().load({"job": {"+hidden": True, "salary": 2}})
+    job = config.root().get_child("job")
+    assert job.hidden
+    assert config.root().get("job/salary") == 2
+
+
+def test_load_into_subsection_node(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    with open(filename, "w") as f:
+        f.write("info:\n  name: Zed\n  age: 44\njob:\n  salary: 9\n")
+    config = build()
+    config.load(filename, node=config.root().get_child("info"))
+    assert config.root().get("info/name") == "Zed"
+    assert config.root().get("info/age") == 44
+    assert config.root().get("job/salary") == 1
+
+
+def test_load_into_nested_node_with_keys():
+    config = build()
+    deep = config.root().get_child("job/deep")
+    deep.load({"job": {"deep": {"x": 8}}}, keys=["job"])
+    assert config.root().get("job/deep/x") == 8
+
+
+def test_load_callbacks():
+    delivered = []
+    config = build(callback=lambda key, value: delivered.append((key, value, config.root().get("job/salary"))))
+    config.root().load({"info": {"name": "Zed"}, "job": {"salary": 2}})
+    assert delivered == []
+    config.root().load({"info": {"name": "Ann"}, "job": {"salary": 3}}, callbacks=True)
+    # Called once all the values are set
+    assert delivered == [("name", "Ann", 3), ("salary", 3, 3)]
+    assert Callback.callbacks_enabled
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_callbacks_enabled_restored_after_a_load_that_raises(enabled):
+    def fail(*args):
+        raise RuntimeError("load")
+
+    # Raises from the callbacks or, without them, from the notification
+    config = build(callback=fail)
+    config.root().tree.values_changed.connect(fail)
+    previous = Callback.callbacks_enabled
+    Callback.callbacks_enabled = enabled
+    try:
+        with pytest.raises(RuntimeError):
+            config.root().load({"info": {"age": 1}}, callbacks=not enabled)
+        assert Callback.callbacks_enabled is enabled
+        assert config.root().tree.batch is None
+    finally:
+        Callback.callbacks_enabled = previous
@@ -0,0 +1,122 @@
+import threading
+import time
+
+from conftest import exception, pause, result
+from easyconfig.EasyConfig import EasyConfig
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+
+def build():
+    config = EasyConfig()
+    config.root().addSubSection("a").addInt("x", default=0)
+    config.root().addSubSection("b").addInt("y", default=0)
+    return config
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def gate_reads(config):
+    # The n-th read_config (after reading the file) waits for gates[n]
+    gates = []
+    read_config = config.read_config
+
+    def gated(filename, cache=False):
+        gate = threading.Event()
+        gates.append(gate)
+        read = read_config(filename, cache)
+        gate.wait(5)
+        return read
+
+    config.read_config = gated
+    return gates
+
+
+def wait_reads(gates, count, timeout=5):
+    end = time.monotonic() + timeout
+    while len(gates) < count and time.monotonic() < end:
+        time.sleep(0.001)
+    assert len(gates) >= count
+
+
+def test_later_load_of_same_file_and_node_supersedes(tmp_path):
+    filename = write(tmp_path / "c.yaml", "a:\n  x: 1\n")
+    config = build()
+    gates = gate_reads(config)
+    first = config.load_async(filename)
+    second = config.load_async(filename)
+    wait_reads(gates, 2)
+    for gate in gates:
+        gate.set()
+    assert result(second) is True
+    assert result(first) is False
+    assert config.root().get("a/x") == 1
+
+
+def test_loads_of_different_files_and_nodes_are_all_applied(tmp_path):
+    first_file = write(tmp_path / "a.yaml", "a:\n  x: 1\n")
+    second_file = write(tmp_path / "b.yaml", "b:\n  y: 2\n")
+    config = build()
+    a, b = config.root().get_child("a"), config.root().get_child("b")
+    first = config.load_async(first_file, node=a)
+    second = config.load_async(second_file, node=b)
+    assert (result(first), result(second)) == (True, True)
+    assert (config.root().get("a/x"), config.root().get("b/y")) == (1, 2)
+
+
+def test_loads_are_applied_in_start_order(tmp_path):
+    first_file = write(tmp_path / "a.yaml", "a:\n  x: 1\n")
+    second_file = write(tmp_path / "b.yaml", "a:\n  x: 2\n")
+    config = build()
+    gates = gate_reads(config)
+    applied = []
+    config.root().tree.values_changed.connect(lambda paths: applied.append(config.root().get("a/x")))
+    first = config.load_async(first_file)
+    second = config.load_async(second_file)
+    wait_reads(gates, 2)
+    # The second file is read first, it waits for the first one
+    gates[1].set()
+    pause(0.1)
+    assert not second.done()
+    gates[0].set()
+    assert (result(first), result(second)) == (True, True)
+    assert applied == [1, 2]
+    assert config.root().get("a/x") == 2
+
+
+def test_read_error_sets_the_exception(tmp_path):
+    config = build()
+    future = config.load_async(str(tmp_path / "missing.yaml"))
+    assert isinstance(exception(future), FileNotFoundError)
+
+
+def test_read_error_does_not_block_later_loads(tmp_path):
+    filename = write(tmp_path / "c.yaml", "a:\n  x: 3\n")
+    config = build()
+    failed = config.load_async(str(tmp_path / "missing.yaml"))
+    loaded = config.load_async(filename)
+    assert result(loaded) is True
+    assert exception(failed) is not None
+    assert config.root().get("a/x") == 3
+
+
+def test_load_supersedes_load_async_in_progress(tmp_path):
+    path = tmp_path / "c.yaml"
+    filename = write(path, "a:\n  x: 1\n")
+    config = build()
+    gates = gate_reads(config)
+    future = config.load_async(filename)
+    wait_reads(gates, 1)
+    write(path, "a:\n  x: 2\n")
+    # load reads through the same gate, open it beforehand
+    threading.Timer(0.05, lambda: gates[1].set()).start()
+    config.load(filename)
+    assert config.root().get("a/x") == 2
+    gates[0].set()
+    assert result(future) is False
+    assert config.root().get("a/x") == 2
@@ -0,0 +1,124 @@
+import os
+
+from easyconfig.EasyConfig import EasyConfig
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+
+def build():
+    config = EasyConfig()
+    a = config.root().addSubSection("a")
+    a.addInt("x", default=1)
+    a.addSubSection("deep").addString("s", default="text")
+    config.root().addSubSection("b").addInt("y", default=2)
+    config.root().addInt("top", default=3, save=False)
+    return config
+
+
+def saved_text(config, tmp_path, name="c.yaml"):
+    filename = str(tmp_path / name)
+    config.save(filename)
+    return open(filename).read()
+
+
+def test_get_dictionary():
+    config = build()
+    dic = {}
+    config.root().getDictionary(dic)
+    assert dic == {"a": {"x": 1, "deep": {"s": "text"}}, "b": {"y": 2}}
+
+    dic = {"other": 0}
+    config.root().get_child("a").getDictionary(dic)
+    assert dic == {"other": 0, "a": {"x": 1, "deep": {"s": "text"}}}
+
+
+def test_get_dictionary_returns_copies(tmp_path):
+    config = build()
+    dic = {}
+    config.root().getDictionary(dic)
+    dic["a"]["x"] = 999
+    dic["a"]["deep"]["junk"] = 1
+    dic["b"]["junk"] = 1
+
+    assert "999" not in saved_text(config, tmp_path)
+    assert "junk" not in saved_text(config, tmp_path, "d.yaml")
+    assert not config.diff({"a": {"x": 1, "deep": {"s": "text"}}, "b": {"y": 2}})
+    again = {}
+    config.root().getDictionary(again)
+    assert again == {"a": {"x": 1, "deep": {"s": "text"}}, "b": {"y": 2}}
+
+
+def test_cached_dictionary_reuses_unchanged_sections():
+    config = build()
+    root = config.root()
+    first = {}
+    root.cached_dictionary(first)
+    assert not root.dirty
+
+    root.set("b/y", 5)
+    assert root.dirty and root.get_child("b").dirty and not root.get_child("a").dirty
+    second = {}
+    root.cached_dictionary(second)
+    assert second["a"] is first["a"]
+    assert second["b"] is not first["b"]
+    assert second["b"] == {"y": 5}
+    assert first["b"] == {"y": 2}
+
+
+def test_values_not_saved_do_not_change_the_file(tmp_path):
+    config = build()
+    root = config.root()
+    before = saved_text(config, tmp_path)
+    root.set("top", 10)
+    assert saved_text(config, tmp_path) == before
+
+
+def test_save_skipped_when_nothing_changed(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    config = build()
+    stats = config.enable_stats()
+    config.save(filename)
+    config.save(filename)
+    assert stats.snapshot()["save.write"]["count"] == 1
+
+    config.root().set("a/x", 2)
+    config.save(filename)
+    assert stats.snapshot()["save.write"]["count"] == 2
+    assert "x: 2" in open(filename).read()
+
+
+def test_save_not_skipped_after_external_edit(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    config = build()
+    stats = config.enable_stats()
+    config.save(filename)
+    with open(filename, "w") as f:
+        f.write("a:\n  x: 7\n")
+    config.save(filename)
+    assert stats.snapshot()["save.write"]["count"] == 2
+    assert "x: 1" in open(filename).read()
+
+
+def test_save_to_another_file_not_skipped(tmp_path):
+    config = build()
+    first, second = str(tmp_path / "c.yaml"), str(tmp_path / "d.yaml")
+    config.save(first)
+    config.save(second)
+    assert open(second).read() == open(first).read()
+
+
+def test_load_after_save(tmp_path):
+    filename = str(tmp_path / "c.yaml")
+    config = build()
+    config.root().set("a/x", 4)
+    config.root().set("a/deep/s", "other")
+    config.save(filename)
+
+    other = build()
+    other.load(filename)
+    assert other.root().get("a/x") == 4
+    assert other.root().get("a/deep/s") == "other"
+    assert other.root().get("b/y") == 2
+    assert os.listdir(tmp_path) == ["c.yaml"]
@@ -0,0 +1,157 @@
+import dataclasses
+from typing import List
+
+import pytest
+
+from easyconfig.EasyConfig import EasyConfig
+from easyconfig.kind import Kind
+from easyconfig.schema import Schema
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+
+def describe(node):
+    # Everything the add* calls set on the nodes, in the order of the children
+    return [(c.key, c.kind, dict(c.kwargs), dict(c.default_params), c.value, c.save, c.hidden,
+             describe(c) if c.kind == Kind.SUBSECTION else None) for c in node.child]
+
+
+def added(**defaults):
+    # The tree of SPEC built with the add* calls
+    config = EasyConfig(**defaults)
+    root = config.root()
+    root.addString("name", default="Bob", pretty="Name")
+    server = root.addSubSection("server", pretty="Server")
+    server.addString("host", default="localhost")
+    server.addInt("port", default=8080, max=65535)
+    server.addCheckbox("debug", default=False)
+    server.addSubSection("limits").addFloat("ratio", default=0.5)
+    secret = root.addHidden("secret")
+    secret.addPassword("token", default="x")
+    root.addList("items", default=["a", "b"])
+    return config
+
+
+SPEC = {
+    "name": {"type": "str", "default": "Bob", "pretty": "Name"},
+    "server": {"type": "subsection", "pretty": "Server", "fields": {
+        "host": "localhost",
+        "port": {"type": "int", "default": 8080, "max": 65535},
+        "debug": False,
+        "limits": {"ratio": 0.5}}},
+    "secret": {"type": "hidden", "fields": {"token": {"type": "password", "default": "x"}}},
+    "items": ["a", "b"],
+}
+
+YAML = """
+name: {type: str, default: Bob, pretty: Name}
+server:
+  type: subsection
+  pretty: Server
+  fields:
+    host: localhost
+    port: {type: int, default: 8080, max: 65535}
+    debug: false
+    limits:
+      ratio: 0.5
+secret:
+  type: hidden
+  fields:
+    token: {type: password, default: x}
+items: [a, b]
+"""
+
+
+@dataclasses.dataclass
+class Limits:
+    ratio: float = 0.5
+
+
+@dataclasses.dataclass
+class Server:
+    host: str = "localhost"
+    port: int = dataclasses.field(default=8080, metadata={"easyconfig": {"max": 65535}})
+    debug: bool = False
+    limits: Limits = dataclasses.field(default_factory=Limits)
+
+
+@dataclasses.dataclass
+class Secret:
+    token: str = dataclasses.field(default="x", metadata={"easyconfig": {"type": "password"}})
+
+
+@dataclasses.dataclass
+class Config:
+    name: str = dataclasses.field(default="Bob", metadata={"easyconfig": {"pretty": "Name"}})
+    server: Server = dataclasses.field(default_factory=Server, metadata={"easyconfig": {"pretty": "Server"}})
+    secret: Secret = dataclasses.field(default_factory=Secret, metadata={"easyconfig": {"type": "hidden"}})
+    items: List[str] = dataclasses.field(default_factory=lambda: ["a", "b"])
+
+
+@pytest.mark.parametrize("defaults", [{}, {"editable": False}])
+def test_dict_as_add_calls(defaults):
+    config = EasyConfig.from_schema(SPEC, **defaults)
+    assert describe(config.root()) == describe(added(**defaults).root())
+
+
+def test_yaml_text():
+    assert describe(EasyConfig.from_schema(YAML).root()) == describe(added().root())
+
+
+def test_yaml_file(tmp_path):
+    filename = tmp_path / "schema.yaml"
+    filename.write_text(YAML)
+    assert describe(EasyConfig.from_schema(str(filename)).root()) == describe(added().root())
+
+
+def test_dataclass():
+    assert describe(EasyConfig.from_schema(Config).root()) == describe(added().root())
+
+
+def test_hidden_type():
+    config = EasyConfig.from_schema(SPEC)
+    secret = config.root().get_child("secret")
+    assert secret.kind == Kind.SUBSECTION and secret.hidden
+
+
+def test_schema_reused_across_trees():
+    schema = Schema(SPEC)
+    first, second = EasyConfig.from_schema(schema), EasyConfig.from_schema(schema)
+    assert describe(first.root()) == describe(second.root())
+    # Mutable defaults are not shared between the trees
+    first.root().get("items").append("c")
+    assert second.root().get("items") == ["a", "b"]
+    first.root().set("server/port", 1)
+    assert second.root().get("server/port") == 8080
+
+
+def test_build_into_existing_tree():
+    config = EasyConfig()
+    config.root().addInt("other", default=1)
+    Schema({"x": 2}).build(config.root())
+    assert [c.key for c in config.root().child] == ["other", "x"]
+    assert config.root().get("x") == 2
+    with pytest.raises(Exception, match="already exists"):
+        Schema({"x": 3}).build(config.root())
+
+
+def test_mapping_with_type_key_is_a_field_spec():
+    # A subsection with a field named "type" needs the explicit form
+    config = EasyConfig.from_schema({"section": {"type": "str", "default": "s"}})
+    assert config.root().get_child("section").kind == Kind.STR
+    config = EasyConfig.from_schema({"section": {"type": "subsection", "fields": {"type": "str"}}})
+    assert config.root().get("section/type") == "str"
+
+
+@pytest.mark.parametrize("spec", [
+    {"x": {"type": "nope"}},
+    {"x": {"type": "int", "fields": {}}},
+    {"a/b": 1},
+    {"": 1},
+    ["not", "a", "mapping"],
+])
+def test_invalid_schemas(spec):
+    with pytest.raises(Exception):
+        Schema(spec)
@@ -0,0 +1,155 @@
+import time
+
+import pytest
+
+from conftest import pause, result
+from easyconfig import watch
+from easyconfig.EasyConfig import EasyConfig
+from easyconfig.watch import FileWatcher
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+DELAY = 0.15
+INTERVAL = 0.05
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def mode(request, monkeypatch):
+    if request.param == "polling":
+        monkeypatch.setattr(watch, "inotify_lib", lambda: None)
+    elif watch.inotify_lib() is None:
+        pytest.skip("inotify not available")
+    return request.param
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        pause(0.01)
+    return condition()
+
+
+def settle():
+    # Longer than a burst is waited for in both modes
+    pause(DELAY + INTERVAL + 0.3)
+
+
+def burst(filename, values):
+    for value in values:
+        with open(filename, "w") as f:
+            f.write("x: {}\n".format(value))
+        time.sleep(0.02)
+
+
+def start(filename, on_change):
+    watcher = FileWatcher(filename, on_change, DELAY, INTERVAL).start()
+    assert wait_for(lambda: watcher.mode is not None)
+    # The polling thread takes its first stat when it starts
+    time.sleep(INTERVAL)
+    return watcher
+
+
+def test_one_change_per_burst(tmp_path, mode):
+    filename = str(tmp_path / "c.yaml")
+    burst(filename, [0])
+    calls = []
+    watcher = start(filename, lambda: calls.append(open(filename).read()))
+    try:
+        assert watcher.mode == mode
+        burst(filename, range(1, 8))
+        assert wait_for(lambda: calls)
+        settle()
+        assert calls == ["x: 7\n"]
+
+        burst(filename, [8, 9])
+        assert wait_for(lambda: len(calls) == 2)
+        settle()
+        assert calls == ["x: 7\n", "x: 9\n"]
+    finally:
+        watcher.stop()
+
+
+def test_stop(tmp_path, mode):
+    filename = str(tmp_path / "c.yaml")
+    burst(filename, [0])
+    calls = []
+    watcher = start(filename, lambda: calls.append(1))
+    watcher.stop()
+    assert not watcher.thread.is_alive()
+    burst(filename, [1])
+    settle()
+    assert calls == []
+
+
+def test_other_files_of_the_folder_are_ignored(tmp_path, mode):
+    filename = str(tmp_path / "c.yaml")
+    burst(filename, [0])
+    calls = []
+    watcher = start(filename, lambda: calls.append(1))
+    try:
+        burst(str(tmp_path / "other.yaml"), [1, 2])
+        settle()
+        assert calls == []
+    finally:
+        watcher.stop()
+
+
+def build(filename):
+    config = EasyConfig()
+    config.root().addInt("x", default=0)
+    config.root().addInt("y", default=0)
+    config.save(filename)
+    return config
+
+
+def counting_loads(config):
+    loads = []
+    load_async = config.load_async
+
+    def counting(*args, **kwargs):
+        future = load_async(*args, **kwargs)
+        loads.append(future)
+        return future
+
+    config.load_async = counting
+    return loads
+
+
+def test_watch_reloads_once_per_burst(tmp_path, mode):
+    filename = str(tmp_path / "c.yaml")
+    config = build(filename)
+    loads = counting_loads(config)
+    changes = []
+    config.root().tree.values_changed.connect(lambda paths: changes.append(paths))
+    config.watch(filename, delay=DELAY, interval=INTERVAL)
+    try:
+        assert wait_for(lambda: config.watchers[str(tmp_path / "c.yaml")].mode == mode)
+        time.sleep(INTERVAL)
+        burst(filename, range(1, 6))
+        assert wait_for(lambda: config.root().get("x") == 5)
+        settle()
+        assert len(loads) == 1 and result(loads[0])
+        # Only the field that changed is notified
+        assert changes == [["x"]]
+    finally:
+        config.unwatch()
+
+
+def test_watch_skips_own_saves(tmp_path, mode):
+    filename = str(tmp_path / "c.yaml")
+    config = build(filename)
+    loads = counting_loads(config)
+    config.watch(filename, delay=DELAY, interval=INTERVAL)
+    try:
+        time.sleep(INTERVAL * 2)
+        for value in range(1, 4):
+            config.root().set("y", value)
+            config.save(filename)
+        settle()
+        assert loads == []
+        assert config.root().get("y") == 3
+    finally:
+        config.unwatch()
+    assert config.watchers == {}
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+from conftest import wait_until
+from easyconfig.EasyConfig import EasyConfig
+
+__author__ = "dantard"
+__copyright__ = "dantard"
+__license__ = "MIT"
+
+QTest = pytest.importorskip("PyQt5.QtTest").QTest
+
+
+def test_value_set_in_worker_thread_updates_widget_in_gui_thread(qapp):
+    config = EasyConfig()
+    section = config.root().addSubSection("s")
+    elem = section.addInt("x", default=0)
+    widget = config.get_widget()
+    field = elem.get_widget()
+    assert field is not None
+
+    threads = []
+    set_value = field.set_value
+
+    def recording(value):
+        threads.append(threading.current_thread())
+        set_value(value)
+
+    field.set_value = recording
+    worker = threading.Thread(target=lambda: config.root().set("s/x", 5))
+    worker.start()
+    worker.join()
+
+    assert wait_until(qapp, lambda: field.get_value() == 5)
+    assert threads == [threading.main_thread()]
+    widget.close()
+
+
+def test_batch_in_worker_thread_suspends_updates_in_gui_thread(qapp):
+    config = EasyConfig()
+    root = config.root()
+    for i in range(3):
+        root.addInt("f{}".format(i), default=0)
+    widget = config.get_widget()
+    threads = []
+    set_updates_enabled = widget.list.setUpdatesEnabled
+
+    def recording(enabled):
+        threads.append((threading.current_thread(), enabled))
+        set_updates_enabled(enabled)
+
+    widget.list.setUpdatesEnabled = recording
+    worker = threading.Thread(target=lambda: root.set_values({"f0": 1, "f1": 2, "f2": 3}))
+    worker.start()
+    worker.join()
+
+    fields = [root.get_child("f{}".format(i)).get_widget() for i in range(3)]
+    assert wait_until(qapp, lambda: [f.get_value() for f in fields] == [1, 2, 3])
+    assert wait_until(qapp, lambda: len(threads) == 2)
+    assert threads == [(threading.main_thread(), False), (threading.main_thread(), True)]
+    widget.close()
+
+
+def test_value_set_in_worker_thread_updates_model_in_gui_thread(qapp):
+    config = EasyConfig("model")
+    elem = config.root().addInt("x", default=0)
+    widget = config.get_widget()
+    threads = []
+    widget.model.dataChanged.connect(lambda *args: threads.append(threading.current_thread()))
+
+    worker = threading.Thread(target=lambda: config.root().set("x", 5))
+    worker.start()
+    worker.join()
+
+    assert wait_until(qapp, lambda: threads)
+    assert threads == [threading.main_thread()]
+    assert widget.model.data(widget.model.index_of(elem, 1)) == "5"
+    widget.close()
+
+
+def rate_limited(qapp, **kwargs):
+    # A field whose callback records (time in ms, value) of each call
+    config = EasyConfig()
+    calls = []
+    elem = config.root().addInt("x", default=0, callback=lambda key, value: calls.append(
+        (time.monotonic() * 1000, value)), **kwargs)
+    widget = config.get_widget()
+    field = elem.get_widget()
+
+    def edit(value):
+        # As if edited by the user
+        field.block_signals(True)
+        field.set_value(value)
+        field.block_signals(False)
+        field.value_changed.emit()
+
+    return widget, edit, calls
+
+
+def drive(edit, values, interval):
+    for value in values:
+        edit(value)
+        QTest.qWait(interval)
+
+
+def test_debounce(qapp):
+    widget, edit, calls = rate_limited(qapp, debounce=60)
+    drive(edit, range(1, 11), 5)
+    assert calls == []
+    QTest.qWait(150)
+    assert [value for _, value in calls] == [10]
+    widget.close()
+
+
+def test_throttle(qapp):
+    widget, edit, calls = rate_limited(qapp, throttle=100)
+    start = time.monotonic() * 1000
+    drive(edit, range(1, 31), 10)
+    QTest.qWait(200)
+    times = [t for t, _ in calls]
+    # The first change right away, then at most once every 100 ms
+    assert times[0] - start < 50
+    assert all(b - a >= 99 for a, b in zip(times, times[1:]))
+    assert 3 <= len(calls) <= 5
+    assert calls[-1][1] == 30
+    widget.close()
+
+
+def test_debounce_and_throttle(qapp):
+    widget, edit, calls = rate_limited(qapp, debounce=30, throttle=100)
+    # Pauses longer than debounce, shorter than throttle
+    drive(edit, range(1, 16), 40)
+    QTest.qWait(200)
+    times = [t for t, _ in calls]
+    assert all(b - a >= 99 for a, b in zip(times, times[1:]))
+    assert len(calls) <= 8
+    assert calls[-1][1] == 15
+    widget.close()
+
+
+def test_collect_delivers_pending_change(qapp):
+    widget, edit, calls = rate_limited(qapp, debounce=1000)
+    edit(7)
+    assert calls == []
+    widget.collect()
+    assert [value for _, value in calls] == [7]
+    QTest.qWait(50)
+    assert len(calls) == 1
+    widget.close()